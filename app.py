@@ -1,17 +1,30 @@
-from flask import Flask, request, jsonify, Response, stream_with_context
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-import ollama
 import json
-import time
 from datetime import datetime
 import logging
-import requests
-import numpy as np
-import faiss
 import os
 import re
 import difflib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.time_helper import get_ist_time, get_ist_date, get_ist_datetime
+from utils.lazy_import import lazy_import
+from utils.metrics import MetricsRegistry
+from utils.model_residency import ModelResidency
+from utils.static_assets import StaticAssets
+from utils.tracing import Tracer, new_trace_id
+
+# Heavy dependencies are imported on first use so the app can serve requests immediately
+ollama = lazy_import('ollama')
+requests = lazy_import('requests')
+np = lazy_import('numpy')
+faiss = lazy_import('faiss')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,18 +33,119 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__, static_folder='frontend', static_url_path='')
 CORS(app)  # Enable CORS for all routes
 
+# Minified, hashed and precompressed frontend from build_frontend.py (if it has been run)
+static_assets = StaticAssets(os.path.join(app.root_path, 'frontend', 'dist'))
+
 # Configuration
 OLLAMA_MODEL = 'deepseek-r1:1.5b'
-OLLAMA_URL = "http://localhost:11434"
+OLLAMA_URL = os.environ.get('OLLAMA_HOST', "http://localhost:11434")  # also read by the ollama client
+if '://' not in OLLAMA_URL:
+    OLLAMA_URL = f"http://{OLLAMA_URL}"
 EMBED_MODEL = "mxbai-embed-large"  # Using the available model
 MAX_TOKENS = 2048
 TEMPERATURE = 0.7
+OLLAMA_KEEP_ALIVE = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')  # how long Ollama keeps the model (and KV cache) loaded
+# 'stable' keeps a fixed system preamble and appends turns so Ollama can reuse the cached prompt prefix;
+# 'legacy' puts per-request RAG/time system messages at the front
+PROMPT_LAYOUT = os.environ.get('PROMPT_LAYOUT', 'stable')
+BATCH_CONCURRENCY = 4  # default parallel generations for /chat/batch
+BATCH_MAX_CONCURRENCY = 16
+BATCH_MAX_MESSAGES = 1000
+MODEL_CHECK_INTERVAL = int(os.environ.get('MODEL_CHECK_INTERVAL', '60'))  # seconds between residency checks
+
+# Request tracing (off by default): trace 1 in TRACE_SAMPLE_RATE chat requests and
+# cProfile 1 in PROFILE_SAMPLE_RATE of the traced ones; see /debug/traces
+TRACE_SAMPLE_RATE = int(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '0'))  # keep only traces at least this slow
+TRACE_BUFFER_SIZE = 100
+TRACE_FILE = os.environ.get('TRACE_FILE')  # optional JSON-lines sink for kept traces
+TRACE_ID_PATTERN = re.compile(r'[0-9a-fA-F-]{8,36}')  # accepted client X-Trace-Id (hex or UUID)
 TOP_K = 3
+EMBED_BATCH_SIZE = 32  # documents per embedding request while indexing
+SREC_DATA_FILE = 'srec_qa.json'
+QUERY_CACHE_SIZE = 256  # recent query embeddings kept in memory
+
+# Context selection: only relevant, non-redundant documents go into the prompt
+RAG_MIN_SCORE = 0.5  # minimum cosine similarity for a document to be used
+RAG_MAX_GAP = 0.15  # drop documents scoring this far below the best match
+RAG_MMR_LAMBDA = 0.7  # relevance vs. diversity trade-off when ranking candidates
+RAG_DUPLICATE_THRESHOLD = 0.95  # candidates this similar to a selected document are dropped
+RAG_CANDIDATE_MULTIPLIER = 3  # FAISS results fetched per context slot before filtering
+
+# Messages mentioning any of these get the current IST time and date
+TIME_KEYWORDS = ['time', 'current time', 'ist', 'indian standard time', 'what time', "what's the time", 'date', 'today']
+
+# Fixed first message for the 'stable' prompt layout; must not contain per-request data
+SYSTEM_PREAMBLE = """You are a helpful AI assistant with detailed knowledge about Sree Rama Engineering College (SREC).
+Some user messages start with reference information (SREC knowledge base entries or the current IST time and date) followed by the question.
+
+Important guidelines:
+1. Answer questions about SREC using ONLY the reference information given with the question
+2. Be specific and accurate with details like names, numbers, dates, and contact information
+3. If asked about SREC but the specific information is not in the reference information, say "I don't have that specific information about SREC"
+4. When the current time or date is provided, format it professionally and include both time and date
+5. For general questions not about SREC, respond normally as a helpful AI assistant
+6. Always be helpful and provide complete answers when possible"""
+
+# Metrics exposed on /metrics
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    'chatbot_stage_duration_seconds', 'Time spent in each stage of a chat request', ['stage'])
+TTFT_SECONDS = metrics.histogram(
+    'chatbot_time_to_first_token_seconds', 'Time from request to the first streamed token')
+GENERATION_SECONDS = metrics.histogram(
+    'chatbot_generation_duration_seconds', 'Total LLM generation time', ['endpoint'])
+TOKENS_PER_SECOND = metrics.histogram(
+    'chatbot_tokens_per_second', 'LLM generation throughput', ['endpoint'],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300))
+RAG_HITS = metrics.counter(
+    'chatbot_rag_hits_total', 'Requests that had SREC context added to the prompt', ['source'])
+RAG_FALLBACKS = metrics.counter(
+    'chatbot_rag_fallback_total', 'Responses served from the knowledge base while the LLM was unavailable')
+OFFLINE_RESPONSES = metrics.counter(
+    'chatbot_offline_responses_total', 'Requests answered with the offline error')
+CACHE_HITS = metrics.counter('chatbot_cache_hits_total', 'Cache lookups that hit', ['cache'])
+CACHE_MISSES = metrics.counter('chatbot_cache_misses_total', 'Cache lookups that missed', ['cache'])
+INFLIGHT_STREAMS = metrics.gauge('chatbot_inflight_streams', 'Streaming responses currently in progress')
+HISTORY_MESSAGES = metrics.gauge('chatbot_history_messages', 'Messages held in conversation history')
+HISTORY_CHARS = metrics.gauge('chatbot_history_chars', 'Characters held in conversation history')
+PROMPT_EVAL_SECONDS = metrics.histogram(
+    'chatbot_prompt_eval_seconds', 'Time Ollama spent evaluating the prompt', ['endpoint', 'layout'])
+PROMPT_EVAL_TOKENS = metrics.histogram(
+    'chatbot_prompt_eval_tokens', 'Prompt tokens Ollama evaluated (cached prefix tokens are not counted)',
+    ['endpoint', 'layout'], buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192))
+
+tracer = Tracer(
+    sample_rate=TRACE_SAMPLE_RATE,
+    profile_rate=PROFILE_SAMPLE_RATE,
+    slow_ms=TRACE_SLOW_MS,
+    buffer_size=TRACE_BUFFER_SIZE,
+    sink_path=TRACE_FILE
+)
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage on /metrics and, for traced requests, as a span"""
+    with STAGE_SECONDS.labels(stage=name).time(), tracer.span(name):
+        yield
 
 class RAGSystem:
-    def __init__(self):
+    LOADING_STATES = ('pending', 'loading', 'indexing')  # every other state is terminal
+
+    def __init__(self, data_path=SREC_DATA_FILE, embedder=None, embed_model=EMBED_MODEL):
+        self.data_path = data_path
+        self.embedder = embedder  # optional callable(texts) -> vectors, replaces the Ollama call
+        self.embed_model = embed_model  # Ollama model for documents and queries
         self.store = None
         self.qa_data = []  # raw QA list for local fallback without embeddings
+        self.state = 'pending'  # pending -> loading -> indexing -> ready / keyword_only / disabled / error
+        self.progress = 0
+        self.load_seconds = None
+        self._load_thread = None
+        self._load_lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
         self.srec_keywords = [
             'srec', 'sree rama', 'rama engineering', 'college', 'tirupathi',
             'engineering', 'jntua', 'rami reddy', 'principal', 'department',
@@ -39,29 +153,74 @@ class RAGSystem:
             'hostel', 'library', 'laboratory', 'sports', 'placement', 'faculty',
             'hod', 'chairman', 'address', 'contact', 'phone', 'email', 'website'
         ]
-        self.load_srec_data()
+
+    def start_background_load(self):
+        """Load and index SREC data in a daemon thread (idempotent)"""
+        with self._load_lock:
+            if self._load_thread is not None:
+                return self._load_thread
+            self._load_thread = threading.Thread(
+                target=self.load_srec_data, name='rag-loader', daemon=True
+            )
+            self._load_thread.start()
+            return self._load_thread
+
+    def wait_until_loaded(self, timeout=None):
+        """Block until the background load finishes; returns True if it did"""
+        thread = self._load_thread
+        if thread is None:
+            return self.state not in self.LOADING_STATES
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    @property
+    def is_ready(self):
+        return self.store is not None
+
+    def readiness(self):
+        """Human readable readiness, e.g. 'ready' or 'indexing 40%'"""
+        if self.state == 'indexing':
+            return f"indexing {self.progress}%"
+        return self.state
+
+    def _set_progress(self, done, total):
+        # Embedding dominates indexing time, so it covers 0-90%; FAISS build is the rest
+        self.progress = int(90 * done / total) if total else 90
 
     def load_srec_data(self):
         """Load and index SREC QA data"""
+        started = time.perf_counter()
+        self.state = 'loading'
         try:
             # Load the JSON file
-            if os.path.exists('srec_qa.json'):
-                with open('srec_qa.json', 'r', encoding='utf-8') as f:
+            if os.path.exists(self.data_path):
+                with open(self.data_path, 'r', encoding='utf-8') as f:
                     qa_data = json.load(f)
 
                 self.qa_data = qa_data
                 logger.info(f"Loaded {len(qa_data)} SREC Q&A entries")
+                self.state = 'indexing'
                 try:
-                    self.store = self.ingest_and_index(qa_data)
+                    # Build the store off to the side and swap it in once complete
+                    store = self.ingest_and_index(qa_data, progress=self._set_progress)
+                    self.store = store
+                    self.progress = 100
+                    self.state = 'ready'
                     logger.info("SREC RAG system initialized successfully")
                 except Exception as embed_err:
                     logger.error(f"Embedding/indexing failed, falling back to keyword search only: {embed_err}")
                     self.store = None
+                    self.state = 'keyword_only'
             else:
-                logger.warning("srec_qa.json not found. RAG system disabled.")
+                logger.warning(f"{self.data_path} not found. RAG system disabled.")
+                self.state = 'disabled'
 
         except Exception as e:
             logger.error(f"Failed to initialize RAG system: {e}")
+            self.state = 'error'
+        finally:
+            self.load_seconds = time.perf_counter() - started
+            logger.info(f"RAG initialization finished in {self.load_seconds:.2f}s (state: {self.state})")
 
     def make_docs_from_qa(self, qa_list):
         """Convert Q&A data to documents for indexing"""
@@ -75,10 +234,14 @@ class RAGSystem:
 
         return texts, metas
 
-    def embed_texts(self, texts, model=EMBED_MODEL):
-        """Get embeddings using Ollama"""
+    def embed_texts(self, texts, model=None):
+        """Get embeddings using Ollama (or the configured embedder)"""
+        model = model or self.embed_model
         try:
-            payload = {"model": model, "input": texts}
+            if self.embedder is not None:
+                return self.embedder(texts)
+
+            payload = {"model": model, "input": texts, "keep_alive": OLLAMA_KEEP_ALIVE}
             r = requests.post(f"{OLLAMA_URL}/api/embed", json=payload, timeout=60)
             r.raise_for_status()
             js = r.json()
@@ -106,14 +269,21 @@ class RAGSystem:
         index.add(arr)
         return index, arr
 
-    def ingest_and_index(self, qa_list):
+    def ingest_and_index(self, qa_list, progress=None):
         """Create embeddings and build search index"""
         texts, metas = self.make_docs_from_qa(qa_list)
 
-        logger.info(f"Creating embeddings for {len(texts)} documents using {EMBED_MODEL}")
-        embeddings = self.embed_texts(texts)
-
-        if embeddings is None:
+        logger.info(f"Creating embeddings for {len(texts)} documents using {self.embed_model}")
+        embeddings = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = self.embed_texts(texts[start:start + EMBED_BATCH_SIZE])
+            if batch is None:
+                raise Exception("Failed to create embeddings")
+            embeddings.extend(batch)
+            if progress:
+                progress(len(embeddings), len(texts))
+
+        if not embeddings:
             raise Exception("Failed to create embeddings")
 
         logger.info("Building FAISS index...")
@@ -162,32 +332,89 @@ class RAGSystem:
         query_lower = query.lower()
         return any(keyword in query_lower for keyword in self.srec_keywords)
 
-    def query_rag(self, query, top_k=TOP_K):
-        """Query the RAG system for relevant context"""
+    def embed_query(self, query):
+        """Embed a single query, reusing recent results from an LRU cache"""
+        with self._query_cache_lock:
+            cached = self._query_cache.get(query)
+            if cached is not None:
+                self._query_cache.move_to_end(query)
+        if cached is not None:
+            CACHE_HITS.labels(cache='query_embedding').inc()
+            return cached
+
+        CACHE_MISSES.labels(cache='query_embedding').inc()
+        with stage('embed_query'):
+            q_emb = self.embed_texts([query])
+        if not q_emb:
+            return None
+
+        with self._query_cache_lock:
+            self._query_cache[query] = q_emb[0]
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return q_emb[0]
+
+    def select_context(self, scores, ids, top_k=TOP_K, min_score=RAG_MIN_SCORE, max_gap=RAG_MAX_GAP):
+        """Pick up to top_k relevant, non-redundant documents from one row of FAISS results"""
+        candidates = sorted(
+            ((float(score), int(idx)) for score, idx in zip(scores, ids)
+             if 0 <= idx < len(self.store["texts"])),
+            key=lambda c: (-c[0], c[1])
+        )
+        if not candidates:
+            return []
+
+        best_score = candidates[0][0]
+        candidates = [(score, idx) for score, idx in candidates
+                      if score >= min_score and best_score - score <= max_gap]
+
+        # Maximal marginal relevance over the stored (normalized) document vectors
+        emb_array = self.store["emb_array"]
+        selected = []
+        while candidates and len(selected) < top_k:
+            best = None
+            kept = []
+            for score, idx in candidates:
+                redundancy = max((float(emb_array[idx] @ emb_array[j]) for _, j in selected), default=0.0)
+                if redundancy >= RAG_DUPLICATE_THRESHOLD:
+                    continue
+                kept.append((score, idx))
+                mmr = RAG_MMR_LAMBDA * score - (1 - RAG_MMR_LAMBDA) * redundancy
+                if best is None or mmr > best[0]:
+                    best = (mmr, score, idx)
+            if best is None:
+                break
+            selected.append((best[1], best[2]))
+            candidates = [c for c in kept if c[1] != best[2]]
+
+        return [{
+            "meta": self.store["metas"][idx],
+            "text": self.store["texts"][idx],
+            "score": score
+        } for score, idx in selected]
+
+    def query_rag(self, query, top_k=TOP_K, min_score=RAG_MIN_SCORE, max_gap=RAG_MAX_GAP):
+        """Query the RAG system for relevant context; None when nothing relevant is found"""
         if not self.store:
             return None
 
         try:
             # Get query embedding
-            q_emb = self.embed_texts([query])
+            q_emb = self.embed_query(query)
             if not q_emb:
                 return None
 
-            q_arr = np.array(q_emb[0]).astype("float32")
-            faiss.normalize_L2(q_arr.reshape(1, -1))
-
             # Search for similar documents
-            D, I = self.store["index"].search(q_arr.reshape(1, -1), top_k)
-
-            # Retrieve relevant documents
-            retrieved = []
-            for idx in I[0]:
-                if idx < len(self.store["texts"]):
-                    retrieved.append({
-                        "meta": self.store["metas"][idx],
-                        "text": self.store["texts"][idx],
-                        "score": float(D[0][len(retrieved)])
-                    })
+            with stage('faiss_search'):
+                q_arr = np.array(q_emb).astype("float32")
+                faiss.normalize_L2(q_arr.reshape(1, -1))
+                D, I = self.store["index"].search(q_arr.reshape(1, -1), top_k * RAG_CANDIDATE_MULTIPLIER)
+
+            # Keep only relevant, non-duplicate documents
+            with tracer.span('select_context'):
+                retrieved = self.select_context(D[0], I[0], top_k, min_score, max_gap)
+            if not retrieved:
+                return None
 
             # Build context from retrieved documents
             context = "\n\n---\n\n".join([r["text"] for r in retrieved])
@@ -201,14 +428,96 @@ class RAGSystem:
             logger.error(f"RAG query failed: {e}")
             return None
 
+    def query_rag_batch(self, queries, top_k=TOP_K):
+        """query_rag for many queries: one embedding request and FAISS search per EMBED_BATCH_SIZE queries.
+
+        A chunk whose embedding or search fails is retried one query at a time through
+        retrieve(), so one slow request doesn't drop SREC context for the whole batch.
+        """
+        if not self.store or not queries:
+            return [None] * len(queries)
+
+        queries = list(queries)
+        results = []
+        for start in range(0, len(queries), EMBED_BATCH_SIZE):
+            chunk = queries[start:start + EMBED_BATCH_SIZE]
+            chunk_results = self._query_rag_chunk(chunk, top_k)
+            if chunk_results is None:
+                logger.warning(f"Batch retrieval failed for {len(chunk)} queries, retrying one at a time")
+                chunk_results = [self.retrieve(query, top_k=top_k) for query in chunk]
+            results.extend(chunk_results)
+        return results
+
+    def _query_rag_chunk(self, queries, top_k):
+        """Batched query_rag for one chunk; None if embedding or search failed"""
+        try:
+            with stage('embed_query_batch'):
+                q_embs = self.embed_texts(queries)
+            if not q_embs or len(q_embs) != len(queries):
+                return None
+
+            with stage('faiss_search_batch'):
+                q_arr = np.array(q_embs).astype("float32")
+                faiss.normalize_L2(q_arr)
+                D, I = self.store["index"].search(q_arr, top_k * RAG_CANDIDATE_MULTIPLIER)
+
+            results = []
+            for scores, ids in zip(D, I):
+                retrieved = self.select_context(scores, ids, top_k)
+                if retrieved:
+                    RAG_HITS.labels(source='faiss').inc()
+                    results.append({
+                        "context": "\n\n---\n\n".join(r["text"] for r in retrieved),
+                        "retrieved": retrieved
+                    })
+                else:
+                    results.append(None)
+            return results
+
+        except Exception as e:
+            logger.error(f"Batch RAG query failed: {e}")
+            return None
+
+    def retrieve(self, query, top_k=TOP_K):
+        """Best available context: FAISS once indexed, keyword search until then"""
+        if self.is_ready:
+            rag_result = self.query_rag(query, top_k=top_k)
+            if rag_result and rag_result["context"]:
+                RAG_HITS.labels(source='faiss').inc()
+            return rag_result
+
+        local_hits = self.local_search(query, top_k=top_k)
+        if not local_hits:
+            return None
+
+        RAG_HITS.labels(source='keyword').inc()
+        retrieved = [{
+            "meta": {"question": hit["question"], "answer": hit["answer"]},
+            "text": f"Q: {hit['question']}\nA: {hit['answer']}",
+            "score": hit["score"]
+        } for hit in local_hits]
+        return {
+            "context": "\n\n---\n\n".join(r["text"] for r in retrieved),
+            "retrieved": retrieved
+        }
+
 class ChatBot:
     def __init__(self):
         self.conversation_history = []
         self.max_history = 10
         self.rag_system = RAGSystem()
+        HISTORY_MESSAGES.set_function(lambda: len(self.conversation_history))
+        HISTORY_CHARS.set_function(
+            lambda: sum(len(m['content']) for m in list(self.conversation_history)))
 
     def rag_fallback_response(self, user_message):
         """Return a non-LLM response using only RAG data, or None if unavailable."""
+        reply = self._rag_fallback_text(user_message)
+        if reply:
+            RAG_FALLBACKS.inc()
+        return reply
+
+    def _rag_fallback_text(self, user_message):
         # Preferred: embedding-backed RAG if available
         if self.rag_system.store:
             rag_result = self.rag_system.query_rag(user_message)
@@ -244,29 +553,52 @@ class ChatBot:
 
         # Keep only recent history to avoid context overflow
         if len(self.conversation_history) > self.max_history * 2:
-            self.conversation_history = self.conversation_history[-self.max_history * 2:]
+            if PROMPT_LAYOUT == 'stable':
+                # Trim in large steps so the cached prompt prefix survives most turns
+                self.conversation_history = self.conversation_history[-self.max_history:]
+            else:
+                self.conversation_history = self.conversation_history[-self.max_history * 2:]
 
     def get_context_messages(self, user_message):
         """Get messages for context including current user message"""
-        messages = self.conversation_history.copy()
+        return self.build_context(user_message)[0]
+
+    def build_context(self, user_message):
+        """Messages for the model, plus whether retrieval added SREC context to them"""
+        # Envelope around the intent, embed_query, faiss_search and prompt_build stages
+        with stage('context_total'):
+            messages, rag_result = self._build_context_messages(user_message)
+        return messages, bool(rag_result and rag_result["context"])
+
+    def _build_context_messages(self, user_message):
+        """(messages, rag_result) for the configured prompt layout"""
+        if PROMPT_LAYOUT == 'stable':
+            return self._build_stable_messages(user_message)
+
+        with tracer.span('history_copy'):
+            messages = self.conversation_history.copy()
 
         # Handle time-related queries
-        time_keywords = ['time', 'current time', 'ist', 'indian standard time', 'what time', "what's the time", 'date', 'today']
-        if any(keyword in user_message.lower() for keyword in time_keywords):
-            current_time = get_ist_time()
-            current_date = get_ist_date()
-            time_message = {
-                'role': 'system',
-                'content': f"You are an AI assistant. The current time in IST is {current_time} and the date is {current_date}. Format your response professionally and include both time and date."
-            }
-            messages = [time_message]
-            messages.append({'role': 'user', 'content': user_message})
-            return messages
+        if any(keyword in user_message.lower() for keyword in TIME_KEYWORDS):
+            with stage('prompt_build'):
+                current_time = get_ist_time()
+                current_date = get_ist_date()
+                time_message = {
+                    'role': 'system',
+                    'content': f"You are an AI assistant. The current time in IST is {current_time} and the date is {current_date}. Format your response professionally and include both time and date."
+                }
+                messages = [time_message]
+                messages.append({'role': 'user', 'content': user_message})
+            return messages, None
 
         # Check if this is an SREC-related question
-        if self.rag_system.is_srec_question(user_message):
-            rag_result = self.rag_system.query_rag(user_message)
+        rag_result = None
+        with stage('intent'):
+            is_srec = self.rag_system.is_srec_question(user_message)
+        if is_srec:
+            rag_result = self.rag_system.retrieve(user_message)
 
+        with stage('prompt_build'):
             if rag_result and rag_result["context"]:
                 # Create a system message with SREC context
                 system_message = {
@@ -285,18 +617,200 @@ Important guidelines:
                 }
                 messages = [system_message] + messages
 
-        messages.append({'role': 'user', 'content': user_message})
-        return messages
-
-# Global chatbot instance
+            messages.append({'role': 'user', 'content': user_message})
+        return messages, rag_result
+
+    def _build_stable_messages(self, user_message):
+        """Fixed preamble, then history, then volatile data with the new question.
+
+        The preamble and all earlier turns form a prefix Ollama can reuse from its cache.
+        History stores the bare question, so when the previous turn carried reference
+        notes the prompt diverges at that turn and its question and answer are evaluated
+        again along with the new message. Keeping the notes in history would avoid that,
+        but the retrieved context of every turn would soon fill num_ctx.
+        """
+        messages = [{'role': 'system', 'content': SYSTEM_PREAMBLE}]
+        with tracer.span('history_copy'):
+            messages.extend({'role': m['role'], 'content': m['content']} for m in self.conversation_history)
+
+        rag_result = None
+        with stage('intent'):
+            is_srec = self.rag_system.is_srec_question(user_message)
+        if is_srec:
+            rag_result = self.rag_system.retrieve(user_message)
+
+        with stage('prompt_build'):
+            messages.append({'role': 'user', 'content': self._compose_user_turn(user_message, rag_result)})
+        return messages, rag_result
+
+    def _compose_user_turn(self, user_message, rag_result):
+        """User message with the volatile reference data (time, SREC context) in front of it"""
+        notes = []
+        if any(keyword in user_message.lower() for keyword in TIME_KEYWORDS):
+            notes.append(f"Current time in IST: {get_ist_time()}, date: {get_ist_date()}")
+
+        if rag_result and rag_result["context"]:
+            notes.append(f"SREC reference information:\n{rag_result['context']}")
+
+        if not notes:
+            return user_message
+        return "\n\n".join(notes) + f"\n\nQuestion: {user_message}"
+
+    def answer_batch(self, user_messages, concurrency=BATCH_CONCURRENCY):
+        """Answer many independent questions, yielding each result as it finishes.
+
+        Retrieval is batched (see RAGSystem.query_rag_batch) and generations
+        run with bounded concurrency. Conversation history is neither used nor updated.
+        """
+        srec_indexes = [i for i, m in enumerate(user_messages) if self.rag_system.is_srec_question(m)]
+        rag_results = [None] * len(user_messages)
+        if self.rag_system.is_ready:
+            batch = self.rag_system.query_rag_batch([user_messages[i] for i in srec_indexes])
+            for i, rag_result in zip(srec_indexes, batch):
+                rag_results[i] = rag_result
+        else:
+            for i in srec_indexes:
+                rag_results[i] = self.rag_system.retrieve(user_messages[i])
+
+        def answer(i):
+            user_message = user_messages[i]
+            messages = [
+                {'role': 'system', 'content': SYSTEM_PREAMBLE},
+                {'role': 'user', 'content': self._compose_user_turn(user_message, rag_results[i])}
+            ]
+            result = {'index': i, 'message': user_message, 'used_rag': rag_results[i] is not None}
+            started = time.perf_counter()
+            try:
+                response = ollama.chat(
+                    model=OLLAMA_MODEL,
+                    messages=messages,
+                    stream=False,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
+                    options={
+                        'temperature': TEMPERATURE,
+                        'top_p': 0.9,
+                        'num_ctx': MAX_TOKENS,
+                        'repeat_penalty': 1.1
+                    }
+                )
+                record_generation('chat_batch', time.perf_counter() - started, None, response)
+                result.update(response=response['message']['content'], success=True)
+            except Exception as llm_error:
+                logger.error(f"Batch item {i}: LLM unavailable, trying RAG fallback: {llm_error}")
+                rag_reply = self.rag_fallback_response(user_message)
+                if rag_reply:
+                    result.update(response=rag_reply, success=True, fallback=True)
+                else:
+                    OFFLINE_RESPONSES.inc()
+                    result.update(error='The assistant is offline. Start the model server or load RAG data.',
+                                  success=False, offline=True)
+            result['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+            return result
+
+        pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='chat-batch')
+        futures = [pool.submit(answer, i) for i in range(len(user_messages))]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Client went away or we are done: drop anything not started yet
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+# Global chatbot instance; the RAG index is built in the background once the app starts serving
 chatbot = ChatBot()
 
+def warm_chat_model():
+    """Load the chat model with an empty prompt and pin it with keep_alive"""
+    ollama.generate(model=OLLAMA_MODEL, prompt='', keep_alive=OLLAMA_KEEP_ALIVE)
+
+def warm_embed_model():
+    """Load the embedding model with a one-word request and pin it with keep_alive"""
+    r = requests.post(f"{OLLAMA_URL}/api/embed",
+                      json={"model": EMBED_MODEL, "input": ["warm up"], "keep_alive": OLLAMA_KEEP_ALIVE},
+                      timeout=300)
+    r.raise_for_status()
+
+def list_loaded_models():
+    """Names of the models Ollama currently holds in memory"""
+    r = requests.get(f"{OLLAMA_URL}/api/ps", timeout=10)
+    r.raise_for_status()
+    return [m.get('name') or m.get('model', '') for m in r.json().get('models', [])]
+
+# Warm-up and re-warming after idle eviction; started from __main__
+model_residency = ModelResidency(
+    {OLLAMA_MODEL: warm_chat_model, EMBED_MODEL: warm_embed_model},
+    list_loaded_models,
+    interval=MODEL_CHECK_INTERVAL
+)
+MODEL_WARM = metrics.gauge('chatbot_model_warm', 'Whether the model is loaded and warm (1) or not (0)', ['model'])
+for _model_name in model_residency.warmers:
+    MODEL_WARM.labels(model=_model_name).set_function(
+        lambda name=_model_name: 1 if model_residency.is_warm(name) else 0)
+
+_background_started = False
+
+def start_background_services():
+    """Start building the RAG index and warming the models for a serving process (idempotent).
+
+    Called from __main__ and on the first request, never on import, so tools and
+    tests that import this module only start it when they ask for it.
+    """
+    global _background_started
+    if _background_started:
+        return
+    _background_started = True
+    chatbot.rag_system.start_background_load()
+    model_residency.start()
+
+STARTUP_SECONDS = time.perf_counter() - _IMPORT_STARTED
+logger.info(f"App ready to serve in {STARTUP_SECONDS:.3f}s")
+
+def serve_static_asset(name):
+    """Send a prebuilt frontend file, counting conditional-request hits"""
+    response, not_modified = static_assets.response(name, request)
+    if not_modified:
+        CACHE_HITS.labels(cache='static').inc()
+    else:
+        CACHE_MISSES.labels(cache='static').inc()
+    return response
+
+@app.before_request
+def assign_trace_id():
+    """Per-request trace id, taken from X-Trace-Id when the caller sends a valid one"""
+    trace_id = request.headers.get('X-Trace-Id', '')
+    g.trace_id = trace_id if TRACE_ID_PATTERN.fullmatch(trace_id) else new_trace_id()
+
+@app.before_request
+def ensure_background_services():
+    """Covers servers that import the app without running __main__ (WSGI, app.run from tools)"""
+    start_background_services()
+
+@app.after_request
+def add_trace_id_header(response):
+    trace_id = g.get('trace_id')
+    if trace_id:
+        response.headers['X-Trace-Id'] = trace_id
+    return response
+
+@app.before_request
+def serve_prebuilt_frontend():
+    """Short-circuit requests for built frontend files before routing"""
+    if request.method in ('GET', 'HEAD') and static_assets.enabled:
+        name = request.path.lstrip('/')
+        if static_assets.has(name):
+            return serve_static_asset(name)
+    return None
+
 @app.route('/', methods=['GET'])
 def root():
     """Serve the frontend UI for browsers; JSON health for API clients."""
     best = request.accept_mimetypes.best_match(['text/html', 'application/json'])
 
     if best == 'text/html' and request.accept_mimetypes[best] > request.accept_mimetypes['application/json']:
+        if static_assets.has('index.html'):
+            return serve_static_asset('index.html')
         return app.send_static_file('index.html')
 
     try:
@@ -319,6 +833,24 @@ def root():
             'error': str(e)
         }), 500
 
+def record_generation(endpoint, elapsed, token_chunks, final_chunk):
+    """Record generation time and throughput, preferring Ollama's own token counts"""
+    GENERATION_SECONDS.labels(endpoint=endpoint).observe(elapsed)
+
+    prompt_eval_count = final_chunk.get('prompt_eval_count') if final_chunk else None
+    prompt_eval_duration = final_chunk.get('prompt_eval_duration') if final_chunk else None
+    if prompt_eval_count is not None:
+        PROMPT_EVAL_TOKENS.labels(endpoint=endpoint, layout=PROMPT_LAYOUT).observe(prompt_eval_count)
+    if prompt_eval_duration is not None:
+        PROMPT_EVAL_SECONDS.labels(endpoint=endpoint, layout=PROMPT_LAYOUT).observe(prompt_eval_duration / 1e9)
+
+    eval_count = final_chunk.get('eval_count') if final_chunk else None
+    eval_duration = final_chunk.get('eval_duration') if final_chunk else None
+    if eval_count and eval_duration:
+        TOKENS_PER_SECOND.labels(endpoint=endpoint).observe(eval_count / (eval_duration / 1e9))
+    elif token_chunks and elapsed > 0:
+        TOKENS_PER_SECOND.labels(endpoint=endpoint).observe(token_chunks / elapsed)
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """Main chat endpoint with streaming response and RAG support"""
@@ -332,39 +864,69 @@ def chat():
             return jsonify({'error': 'Message cannot be empty'}), 400
 
         logger.info(f"Received message: {user_message[:100]}...")
+        trace = tracer.start_trace('chat', trace_id=g.get('trace_id'), message_chars=len(user_message))
 
         def generate_response():
+            try:
+                with INFLIGHT_STREAMS.track_inprogress(), tracer.activate(trace):
+                    yield from stream_response()
+            finally:
+                tracer.finish(trace)
+
+        def stream_response():
+            started = time.perf_counter()
             try:
                 # Get conversation context (includes RAG context if applicable)
                 messages = chatbot.get_context_messages(user_message)
 
                 # Stream response from Ollama
                 response_content = ""
-                response_stream = ollama.chat(
-                    model=OLLAMA_MODEL,
-                    messages=messages,
-                    stream=True,
-                    options={
-                        'temperature': TEMPERATURE,
-                        'top_p': 0.9,
-                        'num_ctx': MAX_TOKENS,
-                        'repeat_penalty': 1.1,
-                        'seed': -1
-                    }
-                )
-
-                for chunk in response_stream:
-                    if chunk.get('done', False):
-                        break
-
-                    content = chunk.get('message', {}).get('content', '')
-                    if content:
-                        response_content += content
-                        yield f"data: {json.dumps({'content': content, 'done': False})}\n\n"
+                with tracer.span('llm_request'):
+                    response_stream = ollama.chat(
+                        model=OLLAMA_MODEL,
+                        messages=messages,
+                        stream=True,
+                        keep_alive=OLLAMA_KEEP_ALIVE,
+                        options={
+                            'temperature': TEMPERATURE,
+                            'top_p': 0.9,
+                            'num_ctx': MAX_TOKENS,
+                            'repeat_penalty': 1.1,
+                            'seed': -1
+                        }
+                    )
+
+                generation_started = time.perf_counter()
+                first_token_at = None
+                token_chunks = 0
+                final_chunk = None
+                with tracer.span('llm_stream'):
+                    for chunk in response_stream:
+                        if chunk.get('done', False):
+                            final_chunk = chunk
+                            break
+
+                        content = chunk.get('message', {}).get('content', '')
+                        if content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                                TTFT_SECONDS.observe(first_token_at - started)
+                            token_chunks += 1
+                            response_content += content
+                            yield f"data: {json.dumps({'content': content, 'done': False})}\n\n"
+
+                record_generation('chat', time.perf_counter() - generation_started, token_chunks, final_chunk)
+                if trace is not None:
+                    trace.attrs.update(
+                        ttft_ms=round((first_token_at - started) * 1000, 3) if first_token_at else None,
+                        chunks=token_chunks,
+                        prompt_eval_count=final_chunk.get('prompt_eval_count') if final_chunk else None
+                    )
 
                 # Add to conversation history
-                chatbot.add_to_history('user', user_message)
-                chatbot.add_to_history('assistant', response_content)
+                with tracer.span('history_update'):
+                    chatbot.add_to_history('user', user_message)
+                    chatbot.add_to_history('assistant', response_content)
 
                 # Send completion signal
                 yield f"data: {json.dumps({'content': '', 'done': True})}\n\n"
@@ -383,6 +945,7 @@ def chat():
                     return
 
                 # If no RAG, signal offline
+                OFFLINE_RESPONSES.inc()
                 offline_response = {
                     'error': 'The assistant is offline. Start the model server or load RAG data.',
                     'done': True,
@@ -406,6 +969,14 @@ def chat():
 @app.route('/chat/simple', methods=['POST'])
 def chat_simple():
     """Non-streaming chat endpoint with RAG support"""
+    trace = tracer.start_trace('chat_simple', trace_id=g.get('trace_id'))
+    with tracer.activate(trace):
+        try:
+            return _chat_simple()
+        finally:
+            tracer.finish(trace)
+
+def _chat_simple():
     try:
         data = request.get_json()
         if not data or 'message' not in data:
@@ -416,30 +987,35 @@ def chat_simple():
             return jsonify({'error': 'Message cannot be empty'}), 400
 
         # Get conversation context (includes RAG context if applicable)
-        messages = chatbot.get_context_messages(user_message)
+        messages, used_rag = chatbot.build_context(user_message)
 
         response_content = None
 
         try:
             # Preferred: LLM response
-            response = ollama.chat(
-                model=OLLAMA_MODEL,
-                messages=messages,
-                stream=False,
-                options={
-                    'temperature': TEMPERATURE,
-                    'top_p': 0.9,
-                    'num_ctx': MAX_TOKENS,
-                    'repeat_penalty': 1.1
-                }
-            )
+            generation_started = time.perf_counter()
+            with tracer.span('llm_generate'):
+                response = ollama.chat(
+                    model=OLLAMA_MODEL,
+                    messages=messages,
+                    stream=False,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
+                    options={
+                        'temperature': TEMPERATURE,
+                        'top_p': 0.9,
+                        'num_ctx': MAX_TOKENS,
+                        'repeat_penalty': 1.1
+                    }
+                )
             response_content = response['message']['content']
+            record_generation('chat_simple', time.perf_counter() - generation_started, None, response)
         except Exception as llm_error:
             logger.error(f"LLM unavailable, trying RAG fallback: {llm_error}")
             rag_reply = chatbot.rag_fallback_response(user_message)
             if rag_reply:
                 response_content = rag_reply
             else:
+                OFFLINE_RESPONSES.inc()
                 return jsonify({
                     'error': 'The assistant is offline. Start the model server or load RAG data.',
                     'success': False,
@@ -447,16 +1023,14 @@ def chat_simple():
                 }), 503
 
         # Add to conversation history
-        chatbot.add_to_history('user', user_message)
-        chatbot.add_to_history('assistant', response_content)
-
-        # Check if RAG was used
-        is_srec_query = chatbot.rag_system.is_srec_question(user_message)
+        with tracer.span('history_update'):
+            chatbot.add_to_history('user', user_message)
+            chatbot.add_to_history('assistant', response_content)
 
         return jsonify({
             'response': response_content,
             'success': True,
-            'used_rag': is_srec_query,
+            'used_rag': used_rag,
             'rag_available': chatbot.rag_system.store is not None
         })
 
@@ -467,6 +1041,53 @@ def chat_simple():
             'success': False
         }), 500
 
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Answer many messages at once; streams NDJSON results as they finish, history untouched"""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('messages'), list):
+            return jsonify({'error': 'messages must be a list of strings'}), 400
+
+        user_messages = [m.strip() for m in data['messages'] if isinstance(m, str)]
+        if len(user_messages) != len(data['messages']) or not all(user_messages):
+            return jsonify({'error': 'messages must be non-empty strings'}), 400
+        if len(user_messages) > BATCH_MAX_MESSAGES:
+            return jsonify({'error': f'At most {BATCH_MAX_MESSAGES} messages per batch'}), 400
+
+        try:
+            concurrency = int(data.get('concurrency', BATCH_CONCURRENCY))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'concurrency must be an integer'}), 400
+        concurrency = min(max(concurrency, 1), BATCH_MAX_CONCURRENCY)
+
+        logger.info(f"Batch of {len(user_messages)} messages (concurrency {concurrency})")
+
+        def generate_results():
+            started = time.perf_counter()
+            answered = 0
+            for result in chatbot.answer_batch(user_messages, concurrency):
+                answered += 1
+                yield json.dumps(result) + "\n"
+            yield json.dumps({
+                'done': True,
+                'count': answered,
+                'elapsed_seconds': round(time.perf_counter() - started, 3)
+            }) + "\n"
+
+        return Response(
+            stream_with_context(generate_results()),
+            content_type='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Batch chat error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/chat/clear', methods=['POST'])
 def clear_history():
     """Clear conversation history"""
@@ -483,6 +1104,26 @@ def clear_history():
 @app.route('/status', methods=['GET'])
 def get_status():
     """Get chatbot status and model info"""
+    # Readiness does not depend on Ollama, so report it even when the model server is down
+    rag_system = chatbot.rag_system
+    loading = rag_system.state in RAGSystem.LOADING_STATES
+    local_status = {
+        'conversation_length': len(chatbot.conversation_history),
+        'rag_system': {
+            'enabled': rag_system.store is not None,
+            'srec_data_loaded': rag_system.store is not None,
+            'documents_indexed': len(rag_system.store['texts']) if rag_system.store else 0,
+            'state': rag_system.state,
+            'readiness': rag_system.readiness(),
+            'progress': rag_system.progress
+        },
+        'startup': {
+            'app_ready_seconds': round(STARTUP_SECONDS, 3),
+            'rag_ready_seconds': round(rag_system.load_seconds, 3) if rag_system.load_seconds is not None else None
+        },
+        'model_residency': dict(model_residency.status(), keep_alive=OLLAMA_KEEP_ALIVE)
+    }
+
     try:
         models_response = ollama.list()
         logger.info(f"Ollama models response: {models_response}")
@@ -508,14 +1149,9 @@ def get_status():
             'embed_model': EMBED_MODEL,
             'model_info': model_info,
             'available_models': available_models,
-            'conversation_length': len(chatbot.conversation_history),
-            'status': 'ready',
+            'status': rag_system.readiness() if loading else 'ready',
             'connected': True,
-            'rag_system': {
-                'enabled': chatbot.rag_system.store is not None,
-                'srec_data_loaded': chatbot.rag_system.store is not None,
-                'documents_indexed': len(chatbot.rag_system.store['texts']) if chatbot.rag_system.store else 0
-            }
+            **local_status
         })
 
     except Exception as e:
@@ -523,9 +1159,43 @@ def get_status():
         return jsonify({
             'status': 'error',
             'error': str(e),
-            'connected': False
+            'connected': False,
+            **local_status
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text-format metrics"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/debug/traces', methods=['GET'])
+def get_traces():
+    """Recent slow traces as JSON, or Chrome trace format with ?format=chrome"""
+    limit = request.args.get('limit', 20, type=int)
+    min_ms = request.args.get('min_ms', 0.0, type=float)
+    traces = tracer.recent(limit=limit, min_ms=min_ms)
+
+    if request.args.get('format') == 'chrome':
+        return jsonify(Tracer.chrome_trace(traces))
+
+    return jsonify({
+        'enabled': tracer.enabled,
+        'sample_rate': TRACE_SAMPLE_RATE,
+        'profile_rate': PROFILE_SAMPLE_RATE,
+        'slow_ms': TRACE_SLOW_MS,
+        'traces': [t.to_dict() for t in traces]
+    })
+
+@app.route('/debug/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """A single kept trace by id"""
+    trace = tracer.get(trace_id)
+    if trace is None:
+        return jsonify({'error': 'Trace not found'}), 404
+    if request.args.get('format') == 'chrome':
+        return jsonify(Tracer.chrome_trace([trace]))
+    return jsonify(trace.to_dict())
+
 @app.route('/api/health', methods=['GET'])
 def api_health():
     """Simple health endpoint"""
@@ -561,13 +1231,18 @@ if __name__ == '__main__':
     print(f"🔍 Embedding Model: {EMBED_MODEL}")
     print(f"🌡️ Temperature: {TEMPERATURE}")
     print(f"📝 Max Tokens: {MAX_TOKENS}")
+    print(f"🧱 Prompt layout: {PROMPT_LAYOUT} (keep_alive {OLLAMA_KEEP_ALIVE})")
+    print(f"⏱️ Startup time: {STARTUP_SECONDS:.3f}s (RAG index building in background)")
     print("🔗 Endpoints:")
     print("   GET  / - Health check")
     print("   GET  /api/health - API health")
     print("   POST /chat - Streaming chat with RAG")
     print("   POST /chat/simple - Simple chat with RAG")
+    print("   POST /chat/batch - Batch answers as NDJSON (no history)")
     print("   POST /chat/clear - Clear history")
     print("   GET  /status - Get detailed status")
+    print("   GET  /metrics - Prometheus metrics")
+    print("   GET  /debug/traces - Sampled request traces (TRACE_SAMPLE_RATE)")
     print("\n🚀 Server starting on http://localhost:5000")
 
     try:
@@ -599,7 +1274,7 @@ if __name__ == '__main__':
             print(f"   Run: ollama pull {EMBED_MODEL}")
 
         # Check SREC data file
-        if os.path.exists('srec_qa.json'):
+        if os.path.exists(SREC_DATA_FILE):
             print("✅ SREC Q&A data file found")
         else:
             print("⚠️  Warning: srec_qa.json not found - RAG system will be disabled")
@@ -608,6 +1283,13 @@ if __name__ == '__main__':
         print(f"❌ Warning: Could not connect to Ollama: {e}")
         print("   Make sure Ollama is running: 'ollama serve'")
 
+    # Build the RAG index and preload both models in the background, keeping
+    # them resident. With the debug reloader only the serving child does this.
+    debug_mode = True
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not debug_mode:
+        print(f"🔥 Warming up models (keep_alive {OLLAMA_KEEP_ALIVE}, re-check every {MODEL_CHECK_INTERVAL}s)")
+        start_background_services()
+
     # Install required packages reminder
     print("\n📦 Required packages:")
     print("   pip install numpy faiss-cpu requests")
@@ -616,6 +1298,6 @@ if __name__ == '__main__':
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True,
+        debug=debug_mode,
         threaded=True
     )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Answer a file of questions in bulk without touching conversation history.
+
+Input: .txt (one question per line), .csv (a "question" column, else the
+first column) or .json (list of strings). Results are written as NDJSON,
+or as CSV when the output file ends in .csv.
+
+    python batch_chat.py questions.csv -o answers.csv --concurrency 4
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+
+def read_questions(path):
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [q.strip() for q in json.load(f) if isinstance(q, str) and q.strip()]
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            rows = list(csv.reader(f))
+            if not rows:
+                return []
+            header = [h.strip().lower() for h in rows[0]]
+            if 'question' in header:
+                col = header.index('question')
+                rows = rows[1:]
+            else:
+                col = 0
+            return [row[col].strip() for row in rows if len(row) > col and row[col].strip()]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch question answering over the SREC chatbot')
+    parser.add_argument('input', help='.txt, .csv or .json file of questions')
+    parser.add_argument('-o', '--output', help='output file (.csv or NDJSON); default stdout')
+    parser.add_argument('--concurrency', type=int, default=None, help='parallel generations (capped at BATCH_MAX_CONCURRENCY)')
+    parser.add_argument('--index-timeout', type=float, default=600,
+                        help='seconds to wait for the RAG index before answering')
+    args = parser.parse_args()
+
+    questions = read_questions(args.input)
+    if not questions:
+        print("❌ No questions found", file=sys.stderr)
+        sys.exit(1)
+
+    from app import BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, chatbot
+
+    concurrency = min(max(args.concurrency or BATCH_CONCURRENCY, 1), BATCH_MAX_CONCURRENCY)
+
+    # Batch retrieval needs the FAISS index; keyword search is used if it never becomes ready
+    chatbot.rag_system.start_background_load()
+    chatbot.rag_system.wait_until_loaded(args.index_timeout)
+    print(f"🤖 Answering {len(questions)} questions (RAG: {chatbot.rag_system.readiness()})", file=sys.stderr)
+
+    results = [None] * len(questions)
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    as_csv = bool(args.output and args.output.endswith('.csv'))
+    failed = 0
+    try:
+        for done, result in enumerate(chatbot.answer_batch(questions, concurrency), 1):
+            if as_csv:
+                results[result['index']] = result
+            else:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            failed += 0 if result['success'] else 1
+            print(f"   {done}/{len(questions)}", end='\r', file=sys.stderr)
+
+        if as_csv:
+            writer = csv.writer(out)
+            writer.writerow(['question', 'answer', 'used_rag', 'success'])
+            for r in results:
+                writer.writerow([r['message'], r.get('response', r.get('error', '')), r['used_rag'], r['success']])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"\n✅ Done ({failed} failed)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
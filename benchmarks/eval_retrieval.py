@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval evaluation over srec_qa.json.
+
+Builds queries from the QA set (deterministic paraphrases of each question,
+plus an optional file of held-out questions), then measures recall@k, MRR
+and per-query latency for query_rag under several index configurations and
+for local_search, and writes a markdown comparison report.
+
+    python -m benchmarks.eval_retrieval                         # hash embedder, no server needed
+    python -m benchmarks.eval_retrieval --embedder ollama       # real EMBED_MODEL via Ollama
+    python -m benchmarks.eval_retrieval --embedder ollama --embed-model nomic-embed-text
+    python -m benchmarks.eval_retrieval --heldout heldout.json --report retrieval_report.md
+
+The held-out file is a JSON list of {"query": ..., "question": ...} where
+"question" is the srec_qa.json question that should be retrieved.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import time
+
+from benchmarks.synthetic import EMBED_DIM, hash_embed, make_qa, percentile
+
+STOPWORDS = {'what', 'is', 'the', 'of', 'a', 'an', 'are', 'who', 'where', 'when', 'how',
+             'do', 'does', 'can', 'i', 'to', 'in', 'at', 'for', 'there', 'which', 'tell', 'me'}
+SYNONYMS = {
+    'college': 'institute', 'principal': 'head of the college', 'fees': 'fee structure',
+    'located': 'situated', 'contact': 'reach', 'courses': 'programs', 'departments': 'branches',
+    'hostel': 'accommodation', 'placement': 'recruitment', 'email': 'mail id',
+    'phone': 'telephone number', 'address': 'location', 'library': 'reading room',
+}
+PREFIXES = [
+    (r'^what is ', 'tell me about '),
+    (r'^who is ', 'can you tell me who is '),
+    (r'^where is ', 'what is the location of '),
+    (r'^what are ', 'list '),
+    (r'^how (do|can) i ', 'what is the process to '),
+]
+# The indexed question itself: a sanity check, found trivially, so kept out of recall@k and MRR
+SANITY_KINDS = {'exact'}
+
+
+def paraphrases(question, rng):
+    """Deterministic rewrites of a question, keyed by paraphrase kind"""
+    base = re.sub(r'[^\w\s&@.-]', '', question.lower()).strip()
+    words = base.split()
+
+    rewritten = base
+    for pattern, replacement in PREFIXES:
+        rewritten = re.sub(pattern, replacement, rewritten)
+
+    swapped = ' '.join(SYNONYMS.get(w, w) for w in words)
+
+    keywords = ' '.join(w for w in words if w not in STOPWORDS) or base
+
+    typo_words = list(words)
+    candidates = [i for i, w in enumerate(typo_words) if len(w) > 3]
+    if candidates:
+        i = rng.choice(candidates)
+        w = typo_words[i]
+        j = rng.randrange(len(w) - 1)
+        typo_words[i] = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+    typo = ' '.join(typo_words)
+
+    return {'exact': question, 'rewrite': rewritten, 'synonym': swapped,
+            'keywords': keywords, 'typo': typo}
+
+
+def build_queries(qa, heldout_path, seed):
+    """List of (query, target_id, kind)"""
+    rng = random.Random(seed)
+    queries = []
+    for i, item in enumerate(qa):
+        for kind, text in paraphrases(item['question'], rng).items():
+            queries.append((text, i, kind))
+
+    if heldout_path:
+        by_question = {item['question'].strip().lower(): i for i, item in enumerate(qa)}
+        with open(heldout_path, 'r', encoding='utf-8') as f:
+            for entry in json.load(f):
+                target = by_question.get(entry['question'].strip().lower())
+                if target is None:
+                    print(f"⚠️  Held-out target not in dataset: {entry['question']}", file=sys.stderr)
+                    continue
+                queries.append((entry['query'], target, 'heldout'))
+    return queries
+
+
+def build_index(kind, emb_array):
+    """Alternative FAISS index over the same normalized embeddings"""
+    import faiss
+
+    dim = emb_array.shape[1]
+    if kind == 'flat':
+        index = faiss.IndexFlatIP(dim)
+    elif kind == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+    elif kind == 'ivf':
+        nlist = max(1, int(math.sqrt(len(emb_array))))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(emb_array)
+        index.nprobe = max(1, nlist // 4)
+    else:
+        raise ValueError(f"Unknown index type: {kind}")
+    index.add(emb_array)
+    return index
+
+
+def evaluate(search, queries, ks):
+    """Run `search(query) -> ranked ids` over queries; return metrics and per-kind recall@1.
+
+    Recall@k and MRR cover every kind except SANITY_KINDS; latency covers all queries.
+    """
+    latencies, reciprocal_ranks = [], []
+    hits = {k: 0 for k in ks}
+    per_kind = {}
+    for query, target, kind in queries:
+        started = time.perf_counter()
+        ranked = search(query)
+        latencies.append(time.perf_counter() - started)
+
+        rank = ranked.index(target) + 1 if target in ranked else None
+        totals = per_kind.setdefault(kind, [0, 0])
+        totals[0] += 1 if rank == 1 else 0
+        totals[1] += 1
+        if kind in SANITY_KINDS:
+            continue
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        for k in ks:
+            if rank and rank <= k:
+                hits[k] += 1
+
+    n = len(reciprocal_ranks) or 1
+    return {
+        'recall': {k: hits[k] / n for k in ks},
+        'mrr': sum(reciprocal_ranks) / n,
+        'latency_ms': {
+            'mean': sum(latencies) / (len(latencies) or 1) * 1000,
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+        },
+        'recall_at_1_by_kind': {kind: hit / total for kind, (hit, total) in per_kind.items()},
+    }
+
+
+def write_report(path, results, ks, meta):
+    kinds = sorted({kind for r in results.values() for kind in r['recall_at_1_by_kind']})
+    lines = [
+        '# Retrieval evaluation',
+        '',
+        f"- Dataset: `{meta['data']}` ({meta['documents']} documents, {meta['queries']} queries)",
+        f"- Recall@k and MRR exclude the {meta['sanity']} `exact` queries (the indexed question itself); "
+        'see the per-kind table',
+        f"- Held-out queries: {meta['heldout']}" if meta['heldout'] else
+        '- Held-out queries: **none** (pass `--heldout`); all scored queries are generated paraphrases',
+        f"- Embedder: `{meta['embedder']}`",
+        f"- Depth: top {max(ks)}",
+        f"- query_rag cutoffs: min score {meta['min_score']}, max gap {meta['max_gap']}",
+        '',
+        '| method | ' + ' | '.join(f'recall@{k}' for k in ks) + ' | MRR | mean ms | p50 ms | p95 ms |',
+        '|---' * (len(ks) + 5) + '|',
+    ]
+    for name, r in results.items():
+        lat = r['latency_ms']
+        lines.append(f"| {name} | " + ' | '.join(f"{r['recall'][k]:.3f}" for k in ks)
+                     + f" | {r['mrr']:.3f} | {lat['mean']:.2f} | {lat['p50']:.2f} | {lat['p95']:.2f} |")
+    lines += [
+        '',
+        '## Recall@1 by query kind',
+        '',
+        '| method | ' + ' | '.join(kinds) + ' |',
+        '|---' * (len(kinds) + 1) + '|',
+    ]
+    for name, r in results.items():
+        by_kind = r['recall_at_1_by_kind']
+        lines.append(f"| {name} | " + ' | '.join(f"{by_kind.get(k, 0):.3f}" for k in kinds) + ' |')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate retrieval quality and latency')
+    parser.add_argument('--data', default='srec_qa.json')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='evaluate on N synthetic QA entries instead of --data')
+    parser.add_argument('--heldout', help='JSON list of {"query", "question"} held-out pairs')
+    parser.add_argument('--embedder', choices=['hash', 'ollama'], default='hash',
+                        help='hash = deterministic, no model server; ollama = --embed-model')
+    parser.add_argument('--embed-model', help='Ollama embedding model to evaluate (default: EMBED_MODEL)')
+    parser.add_argument('--dim', type=int, default=EMBED_DIM, help='hash embedder dimension')
+    parser.add_argument('--indexes', nargs='+', default=['flat', 'hnsw', 'ivf'])
+    parser.add_argument('--ks', type=int, nargs='+', default=[1, 3, 5])
+    parser.add_argument('--min-score', type=float, help='query_rag similarity cutoff (default: RAG_MIN_SCORE)')
+    parser.add_argument('--max-gap', type=float, help='query_rag gap to best match (default: RAG_MAX_GAP)')
+    parser.add_argument('--no-local', action='store_true', help='skip local_search (slow on large sets)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', default='retrieval_report.md')
+    parser.add_argument('--json', help='also write raw results as JSON')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from app import EMBED_MODEL, RAG_MAX_GAP, RAG_MIN_SCORE, RAGSystem
+    min_score = RAG_MIN_SCORE if args.min_score is None else args.min_score
+    max_gap = RAG_MAX_GAP if args.max_gap is None else args.max_gap
+
+    if args.synthetic:
+        qa, data_name = make_qa(args.synthetic, seed=args.seed), f"synthetic:{args.synthetic}"
+    elif os.path.exists(args.data):
+        with open(args.data, 'r', encoding='utf-8') as f:
+            qa, data_name = json.load(f), args.data
+    else:
+        parser.error(f"{args.data} not found (use --synthetic N to evaluate without it)")
+
+    embed_model = args.embed_model or EMBED_MODEL
+    if args.embed_model and args.embedder == 'hash':
+        parser.error('--embed-model needs --embedder ollama')
+    embedder = (lambda texts: hash_embed(texts, args.dim)) if args.embedder == 'hash' else None
+    rag = RAGSystem(data_path=None, embedder=embedder, embed_model=embed_model)
+    rag.qa_data = qa
+    rag.store = rag.ingest_and_index(qa)
+    emb_array = rag.store['emb_array']
+
+    queries = build_queries(qa, args.heldout, args.seed)
+    depth = max(args.ks)
+    question_ids = {}
+    for i, item in enumerate(qa):
+        question_ids.setdefault(item['question'], i)
+
+    def rag_search(query):
+        result = rag.query_rag(query, top_k=depth, min_score=min_score, max_gap=max_gap)
+        return [r['meta']['id'] for r in result['retrieved']] if result else []
+
+    def local(query):
+        hits = rag.local_search(query, top_k=depth) or []
+        return [question_ids.get(h['question']) for h in hits]
+
+    results = {}
+    for kind in args.indexes:
+        rag.store['index'] = build_index(kind, emb_array)
+        rag._query_cache.clear()
+        results[f"query_rag[{kind}]"] = evaluate(rag_search, queries, args.ks)
+    if not args.no_local:
+        results['local_search'] = evaluate(local, queries, args.ks)
+
+    embedder_name = f"hash-{args.dim}" if args.embedder == 'hash' else embed_model
+    write_report(args.report, results, args.ks, {
+        'data': data_name, 'documents': len(qa), 'queries': len(queries), 'embedder': embedder_name,
+        'min_score': min_score, 'max_gap': max_gap,
+        'sanity': sum(1 for q in queries if q[2] in SANITY_KINDS),
+        'heldout': sum(1 for q in queries if q[2] == 'heldout')
+    })
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    for name, r in results.items():
+        recall = ' '.join(f"R@{k}={r['recall'][k]:.3f}" for k in args.ks)
+        print(f"{name:<20} {recall} MRR={r['mrr']:.3f} p50={r['latency_ms']['p50']:.2f}ms")
+    if not any(q[2] == 'heldout' for q in queries):
+        print("⚠️  No held-out queries: scores cover generated paraphrases only (see --heldout)")
+    print(f"📝 Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
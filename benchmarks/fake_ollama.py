@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Stub Ollama server for benchmarks and offline development.
+
+Implements the parts of the Ollama HTTP API the chatbot uses (/api/chat,
+/api/generate, /api/embed, /api/tags, /api/ps) with configurable token
+rate, first-token latency and failure injection (separate rates for
+generation and embedding requests). Like the real server it only evaluates
+the part of a prompt that differs from the previous prompt for the same
+model, so prompt-prefix reuse shows up in prompt_eval_count.
+
+    python -m benchmarks.fake_ollama --port 11500 --token-rate 40 --latency 0.2
+    OLLAMA_HOST=http://127.0.0.1:11500 python app.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import EMBED_DIM, hash_embed
+
+WORDS = ("Sree Rama Engineering College offers undergraduate and postgraduate "
+         "programmes with experienced faculty modern laboratories and strong placements").split()
+
+
+class FakeOllamaConfig:
+    def __init__(self, token_rate=50.0, latency=0.1, failure_rate=0.0, tokens=64,
+                 embed_latency=0.0, embed_dim=EMBED_DIM, models=('deepseek-r1:1.5b', 'mxbai-embed-large'),
+                 seed=None, prompt_rate=0.0, embed_failure_rate=0.0):
+        self.token_rate = token_rate
+        self.latency = latency
+        self.prompt_rate = prompt_rate
+        self.failure_rate = failure_rate  # applies to /api/chat and /api/generate
+        self.embed_failure_rate = embed_failure_rate  # applies to /api/embed
+        self.tokens = tokens
+        self.embed_latency = embed_latency
+        self.embed_dim = embed_dim
+        self.models = list(models)
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.loaded = set()
+        self.last_prompt = {}  # model -> previous prompt text, emulating the KV cache
+        self.cache_lock = threading.Lock()
+
+    def uncached_chars(self, model, prompt):
+        """Characters of `prompt` beyond the prefix shared with the model's previous prompt"""
+        with self.cache_lock:
+            previous = self.last_prompt.get(model, '')
+            self.last_prompt[model] = prompt
+        shared = 0
+        for a, b in zip(previous, prompt):
+            if a != b:
+                break
+            shared += 1
+        return len(prompt) - shared
+
+    def should_fail(self, rate):
+        with self.rng_lock:
+            return self.rng.random() < rate
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json({'models': [{'name': m, 'model': m, 'size': 0, 'modified_at': _now()}
+                                        for m in self.config.models]})
+        elif self.path == '/api/ps':
+            self._send_json({'models': [{'name': m, 'model': m} for m in sorted(self.config.loaded)]})
+        elif self.path == '/api/version':
+            self._send_json({'version': '0.0.0-fake'})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.path == '/api/embed':
+            rate = self.config.embed_failure_rate
+        elif self.path in ('/api/chat', '/api/generate'):
+            rate = self.config.failure_rate
+        else:
+            self._send_json({'error': 'not found'}, 404)
+            return
+        if self.config.should_fail(rate):
+            self._send_json({'error': 'injected failure'}, 500)
+            return
+
+        if self.path == '/api/embed':
+            self._embed(payload)
+        else:
+            self._generate(payload, chat=self.path == '/api/chat')
+
+    def _embed(self, payload):
+        texts = payload.get('input', [])
+        if isinstance(texts, str):
+            texts = [texts]
+        if self.config.embed_latency:
+            time.sleep(self.config.embed_latency)
+        self.config.loaded.add(payload.get('model', ''))
+        self._send_json({'model': payload.get('model'),
+                         'embeddings': hash_embed(texts, self.config.embed_dim)})
+
+    def _generate(self, payload, chat):
+        model = payload.get('model', '')
+        self.config.loaded.add(model)
+        if chat:
+            prompt = ''.join(f"<{m.get('role')}>{m.get('content', '')}" for m in payload.get('messages', []))
+        else:
+            prompt = payload.get('prompt', '')
+        prompt_tokens = max(1, self.config.uncached_chars(model, prompt) // 4)
+        # An empty generate request only loads the model, like the real server
+        n_tokens = 0 if not chat and not payload.get('prompt') else self.config.tokens
+        words = [WORDS[i % len(WORDS)] + ' ' for i in range(n_tokens)]
+        delay = 1.0 / self.config.token_rate if self.config.token_rate > 0 else 0.0
+
+        started = time.perf_counter()
+        prompt_delay = prompt_tokens / self.config.prompt_rate if self.config.prompt_rate > 0 else 0.0
+        time.sleep(self.config.latency + prompt_delay)
+        prompt_done = time.perf_counter()
+
+        def piece(content, done):
+            item = {'model': model, 'created_at': _now(), 'done': done}
+            if chat:
+                item['message'] = {'role': 'assistant', 'content': content}
+            else:
+                item['response'] = content
+            return item
+
+        def final():
+            finished = time.perf_counter()
+            item = piece('', True)
+            item.update({
+                'done_reason': 'stop',
+                'total_duration': int((finished - started) * 1e9),
+                'load_duration': 0,
+                'prompt_eval_count': prompt_tokens,
+                'prompt_eval_duration': int((prompt_done - started) * 1e9),
+                'eval_count': n_tokens,
+                'eval_duration': max(1, int((finished - prompt_done) * 1e9)),
+            })
+            return item
+
+        if not payload.get('stream', True):
+            time.sleep(delay * n_tokens)
+            item = final()
+            if chat:
+                item['message']['content'] = ''.join(words)
+            else:
+                item['response'] = ''.join(words)
+            self._send_json(item)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(delay)
+                self._write_chunk(piece(word, False))
+            self._write_chunk(final())
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _write_chunk(self, item):
+        data = (json.dumps(item) + '\n').encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is normal under load
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def make_server(host='127.0.0.1', port=11500, config=None):
+    """Create (but do not start) a fake Ollama server"""
+    handler = type('ConfiguredFakeOllamaHandler', (FakeOllamaHandler,),
+                   {'config': config or FakeOllamaConfig()})
+    server = FakeOllamaServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Ollama server for benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11500)
+    parser.add_argument('--token-rate', type=float, default=50.0, help='tokens per second per stream')
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds before the first token')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='fraction of chat/generate requests answered with HTTP 500')
+    parser.add_argument('--embed-failure-rate', type=float, default=0.0,
+                        help='fraction of embedding requests answered with HTTP 500')
+    parser.add_argument('--tokens', type=int, default=64, help='tokens per generated response')
+    parser.add_argument('--prompt-rate', type=float, default=0.0,
+                        help='prompt tokens evaluated per second (0 = prompt evaluation is free)')
+    parser.add_argument('--embed-latency', type=float, default=0.0, help='seconds per embedding request')
+    parser.add_argument('--embed-dim', type=int, default=EMBED_DIM)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(token_rate=args.token_rate, latency=args.latency,
+                              failure_rate=args.failure_rate, tokens=args.tokens,
+                              embed_latency=args.embed_latency, embed_dim=args.embed_dim,
+                              seed=args.seed, prompt_rate=args.prompt_rate,
+                              embed_failure_rate=args.embed_failure_rate)
+    server = make_server(args.host, args.port, config)
+    print(f"🧪 Fake Ollama listening on http://{args.host}:{args.port} "
+          f"({args.token_rate} tok/s, {args.latency}s latency, {args.failure_rate:.0%} failures)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Load test for the chatbot API.
+
+By default starts a fake Ollama (benchmarks/fake_ollama.py) and the Flask
+app as subprocesses, then drives /chat and /chat/simple at the requested
+concurrency and reports TTFT/latency percentiles, throughput and error rates.
+The app runs in a temporary directory holding a synthetic srec_qa.json, so
+SREC questions go through intent, embedding and FAISS search.
+
+    python -m benchmarks.load_test --concurrency 8 --requests 200
+    python -m benchmarks.load_test --url http://localhost:5000   # existing server
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.synthetic import make_qa, make_queries, percentile
+
+# Prefix of ChatBot.rag_fallback_response replies, used to spot degraded answers
+FALLBACK_PREFIX = 'The primary model is offline'
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def wait_for_rag(base_url, timeout=300):
+    """Wait until the app has finished indexing, so scenarios don't run against keyword search"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            state = requests.get(f"{base_url}/status", timeout=5).json()['rag_system']['state']
+            if state not in ('pending', 'loading', 'indexing'):
+                return state
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.2)
+    return None
+
+
+def make_app_dir(n):
+    """Temporary app directory with a synthetic srec_qa.json of `n` entries"""
+    app_dir = tempfile.mkdtemp(prefix='chatbot-load-')
+    with open(os.path.join(app_dir, 'srec_qa.json'), 'w', encoding='utf-8') as f:
+        json.dump(make_qa(n), f)
+    return app_dir
+
+
+def start_stack(args, app_dir):
+    """Start fake Ollama and the app; returns (base_url, processes)"""
+    ollama_port, app_port = free_port(), free_port()
+    fake = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.fake_ollama', '--port', str(ollama_port),
+         '--token-rate', str(args.token_rate), '--latency', str(args.latency),
+         '--failure-rate', str(args.failure_rate), '--embed-failure-rate', str(args.embed_failure_rate),
+         '--tokens', str(args.tokens), '--prompt-rate', str(args.prompt_rate)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    if not wait_for(f"http://127.0.0.1:{ollama_port}/api/tags"):
+        fake.terminate()
+        raise RuntimeError('fake Ollama did not start')
+
+    env = dict(os.environ, OLLAMA_HOST=f"http://127.0.0.1:{ollama_port}", PYTHONPATH=REPO_ROOT)
+    if args.prompt_layout:
+        env['PROMPT_LAYOUT'] = args.prompt_layout
+    server = subprocess.Popen(
+        [sys.executable, '-c',
+         f"import logging; logging.disable(logging.INFO)\n"
+         f"from app import app\n"
+         f"app.run(host='127.0.0.1', port={app_port}, threaded=True)"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{app_port}"
+    if not wait_for(f"{base_url}/api/health"):
+        fake.terminate()
+        server.terminate()
+        raise RuntimeError('app did not start')
+    # /api/health answers before the RAG index is built
+    if wait_for_rag(base_url) is None:
+        fake.terminate()
+        server.terminate()
+        raise RuntimeError('app did not finish indexing')
+    return base_url, [server, fake]
+
+
+def call_stream(base_url, message, timeout):
+    """POST /chat and measure TTFT, total time and streamed chunks"""
+    started = time.perf_counter()
+    result = {'ok': False, 'ttft': None, 'chunks': 0}
+    try:
+        with requests.post(f"{base_url}/chat", json={'message': message},
+                           stream=True, timeout=timeout) as r:
+            if r.status_code != 200:
+                result['error'] = f"HTTP {r.status_code}"
+                return result
+            for line in r.iter_lines():
+                if not line.startswith(b'data: '):
+                    continue
+                event = json.loads(line[6:])
+                if event.get('error'):
+                    result['error'] = 'offline' if event.get('offline') else event['error']
+                    break
+                if event.get('content'):
+                    if result['ttft'] is None:
+                        result['ttft'] = time.perf_counter() - started
+                        result['fallback'] = event['content'].startswith(FALLBACK_PREFIX)
+                    result['chunks'] += 1
+                if event.get('done'):
+                    result['ok'] = True
+                    break
+    except requests.exceptions.RequestException as e:
+        result['error'] = type(e).__name__
+    result['latency'] = time.perf_counter() - started
+    return result
+
+
+def call_simple(base_url, message, timeout):
+    """POST /chat/simple and measure total latency"""
+    started = time.perf_counter()
+    result = {'ok': False, 'ttft': None, 'chunks': 0}
+    try:
+        r = requests.post(f"{base_url}/chat/simple", json={'message': message}, timeout=timeout)
+        data = r.json()
+        result['ok'] = r.status_code == 200 and data.get('success', False)
+        if not result['ok']:
+            result['error'] = 'offline' if data.get('offline') else f"HTTP {r.status_code}"
+        else:
+            result['chunks'] = len(data.get('response', '').split())
+            result['fallback'] = data.get('response', '').startswith(FALLBACK_PREFIX)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        result['error'] = type(e).__name__
+    result['latency'] = time.perf_counter() - started
+    return result
+
+
+def run_scenario(base_url, endpoint, messages, concurrency, timeout):
+    call = call_stream if endpoint == '/chat' else call_simple
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda m: call(base_url, m, timeout), messages))
+    wall = time.perf_counter() - started
+
+    ok = [r for r in results if r['ok']]
+    errors = {}
+    for r in results:
+        if not r['ok']:
+            errors[r.get('error', 'unknown')] = errors.get(r.get('error', 'unknown'), 0) + 1
+
+    def pcts(values):
+        return {f"p{p}": percentile(values, p) for p in (50, 95, 99)}
+
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': len(results),
+        'wall_seconds': wall,
+        'requests_per_second': len(results) / wall if wall else 0.0,
+        'tokens_per_second': sum(r['chunks'] for r in ok) / wall if wall else 0.0,
+        'error_rate': 1 - len(ok) / len(results) if results else 0.0,
+        'fallback_rate': sum(1 for r in ok if r.get('fallback')) / len(results) if results else 0.0,
+        'errors': errors,
+        'ttft': pcts([r['ttft'] for r in ok if r['ttft'] is not None]),
+        'latency': pcts([r['latency'] for r in ok]),
+    }
+
+
+def fmt_ms(value):
+    return f"{value * 1000:8.1f}" if value is not None else '       -'
+
+
+def print_report(reports):
+    print(f"\n{'endpoint':<13}{'conc':>5}{'reqs':>6}{'req/s':>8}{'tok/s':>9}{'err%':>7}{'fb%':>6}"
+          f"{'ttft p50':>10}{'p95':>9}{'p99':>9}{'lat p50':>10}{'p95':>9}{'p99':>9}")
+    for r in reports:
+        print(f"{r['endpoint']:<13}{r['concurrency']:>5}{r['requests']:>6}"
+              f"{r['requests_per_second']:>8.1f}{r['tokens_per_second']:>9.1f}{r['error_rate'] * 100:>7.1f}{r['fallback_rate'] * 100:>6.1f}"
+              f"  {fmt_ms(r['ttft']['p50'])} {fmt_ms(r['ttft']['p95'])} {fmt_ms(r['ttft']['p99'])}"
+              f"  {fmt_ms(r['latency']['p50'])} {fmt_ms(r['latency']['p95'])} {fmt_ms(r['latency']['p99'])}")
+        if r['errors']:
+            print(f"{'':<13}errors: {r['errors']}")
+    print("(times in ms; fb% = answered by the RAG-only fallback)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test /chat and /chat/simple')
+    parser.add_argument('--url', help='use an already running server instead of starting one')
+    parser.add_argument('--app-dir', help='working directory for the app (where srec_qa.json lives); '
+                                          'default: a temporary directory with --qa-size synthetic entries')
+    parser.add_argument('--qa-size', type=int, default=500, help='synthetic QA entries when --app-dir is not given')
+    parser.add_argument('--endpoints', nargs='+', default=['/chat', '/chat/simple'],
+                        choices=['/chat', '/chat/simple'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=50, help='requests per scenario')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--token-rate', type=float, default=50.0, help='fake Ollama tokens/sec per stream')
+    parser.add_argument('--latency', type=float, default=0.1, help='fake Ollama first-token latency (s)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fake Ollama chat/generate failure fraction')
+    parser.add_argument('--embed-failure-rate', type=float, default=0.0, help='fake Ollama embedding failure fraction')
+    parser.add_argument('--tokens', type=int, default=64, help='fake Ollama tokens per response')
+    parser.add_argument('--prompt-rate', type=float, default=0.0, help='fake Ollama prompt tokens/sec (0 = free)')
+    parser.add_argument('--prompt-layout', choices=['stable', 'legacy'], help='PROMPT_LAYOUT for the started app')
+    parser.add_argument('--json', help='write the report to this file as JSON')
+    args = parser.parse_args()
+
+    processes = []
+    temp_dir = None
+    base_url = args.url
+    if not base_url:
+        app_dir = args.app_dir
+        if not app_dir:
+            app_dir = temp_dir = make_app_dir(args.qa_size)
+        try:
+            base_url, processes = start_stack(args, app_dir)
+        except RuntimeError:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        print(f"🚀 App on {base_url} backed by fake Ollama "
+              f"({args.token_rate} tok/s, {args.latency}s latency, {args.failure_rate:.0%} failures)")
+    else:
+        wait_for_rag(base_url)
+    print(f"🔍 RAG: {requests.get(f'{base_url}/status', timeout=5).json().get('rag_system', {}).get('readiness')}")
+
+    try:
+        messages = make_queries(args.requests)
+        reports = []
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                # Clear history so runs don't grow each other's prompts
+                requests.post(f"{base_url}/chat/clear", timeout=5)
+                reports.append(run_scenario(base_url, endpoint, messages, concurrency, args.timeout))
+        print_report(reports)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(reports, f, indent=2)
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
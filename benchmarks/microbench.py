@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the retrieval hot paths: build_faiss, query_rag and
+local_search over synthetic QA sets (1k/10k/100k entries by default).
+
+Embeddings come from the deterministic hash embedder, so no model server
+is needed and timings reflect only the code under test.
+
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench --save bench_baseline.json
+    python -m benchmarks.microbench --compare bench_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+from benchmarks.synthetic import EMBED_DIM, hash_embed, make_qa, make_queries, percentile
+
+
+def time_calls(fn, args_list):
+    """Run fn over args_list; return per-call durations in seconds"""
+    durations = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def summarize(durations):
+    return {
+        'calls': len(durations),
+        'mean_ms': sum(durations) / len(durations) * 1000,
+        'p50_ms': percentile(durations, 50) * 1000,
+        'p95_ms': percentile(durations, 95) * 1000,
+    }
+
+
+def bench_size(size, args):
+    from app import RAGSystem
+
+    qa = make_qa(size, seed=size)
+    rag = RAGSystem(data_path=None, embedder=lambda texts: hash_embed(texts, args.dim))
+    rag.qa_data = qa
+
+    texts, metas = rag.make_docs_from_qa(qa)
+    embeddings = hash_embed(texts, args.dim)
+
+    results = {}
+    build = time_calls(rag.build_faiss, [(embeddings,)] * args.build_repeats)
+    results['build_faiss'] = summarize(build)
+
+    index, emb_array = rag.build_faiss(embeddings)
+    rag.store = {'index': index, 'emb_array': emb_array, 'texts': texts, 'metas': metas}
+
+    # Distinct queries so the query-embedding cache never short-circuits the search
+    queries = [(f"{q} #{i}",) for i, q in enumerate(make_queries(args.queries, seed=size + 1))]
+    results['query_rag'] = summarize(time_calls(rag.query_rag, queries))
+
+    local_queries = queries[:args.local_queries]
+    results['local_search'] = summarize(time_calls(rag.local_search, local_queries))
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Return a list of regressions where p50 grew by more than `tolerance`"""
+    regressions = []
+    for size, benches in current.items():
+        for name, stats in benches.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            if stats['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+                regressions.append(f"{name}@{size}: p50 {base['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Retrieval microbenchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--dim', type=int, default=EMBED_DIM, help='embedding dimension')
+    parser.add_argument('--queries', type=int, default=50, help='query_rag calls per size')
+    parser.add_argument('--local-queries', type=int, default=5, help='local_search calls per size (it is O(n))')
+    parser.add_argument('--build-repeats', type=int, default=3)
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs baseline')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {}
+    print(f"{'benchmark':<14}{'size':>8}{'calls':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for size in args.sizes:
+        results[str(size)] = bench_size(size, args)
+        for name, stats in results[str(size)].items():
+            print(f"{name:<14}{size:>8}{stats['calls']:>7}{stats['mean_ms']:>10.2f}"
+                  f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Performance regressions:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ No regressions beyond tolerance")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Measure per-turn prompt evaluation for each prompt layout.
+
+Replays a scripted conversation through ChatBot.get_context_messages and
+Ollama, once per PROMPT_LAYOUT, and reports Ollama's prompt_eval_count and
+prompt_eval_duration per turn. Ollama only evaluates the part of the prompt
+that is not already in its cache, so a prefix-stable layout shows up as
+fewer evaluated tokens per turn.
+
+    python -m benchmarks.prompt_cache                      # against OLLAMA_HOST
+    python -m benchmarks.prompt_cache --fake --prompt-rate 400
+
+With --fake no outside data is needed: the knowledge base is synthetic
+(answers for the scripted SREC questions plus make_qa filler) and embedded
+with the hash embedder. Otherwise srec_qa.json is read from the working
+directory.
+"""
+
+import argparse
+import logging
+import os
+import threading
+
+FAKE_QA_SIZE = 200  # synthetic filler entries in the --fake knowledge base
+
+CONVERSATION = [
+    "What is SREC?",
+    "Who is the principal of SREC?",
+    "What departments are available at SREC?",
+    "What time is it now?",
+    "Explain what machine learning is in two sentences.",
+    "What is the contact email of SREC?",
+    "Where is SREC located?",
+    "Write a hello world program in Python",
+]
+
+
+def fake_knowledge_base():
+    """Synthetic QA with an entry for each scripted SREC question"""
+    from benchmarks.synthetic import make_qa
+
+    answers = [
+        {'question': q, 'answer': f"Reference answer for '{q}' from the SREC office, with contact "
+                                  f"details, timings and the department responsible for it."}
+        for q in CONVERSATION if 'SREC' in q
+    ]
+    return answers + make_qa(FAKE_QA_SIZE)
+
+
+def run_layout(app, layout, turns, fake):
+    app.PROMPT_LAYOUT = layout
+    bot = app.ChatBot()
+    if fake:
+        from benchmarks.synthetic import hash_embed
+
+        qa = fake_knowledge_base()
+        bot.rag_system.embedder = hash_embed
+        bot.rag_system.qa_data = qa
+        bot.rag_system.store = bot.rag_system.ingest_and_index(qa)
+    else:
+        bot.rag_system.load_srec_data()
+
+    rows = []
+    for message in turns:
+        messages = bot.get_context_messages(message)
+        response = app.ollama.chat(
+            model=app.OLLAMA_MODEL,
+            messages=messages,
+            stream=False,
+            keep_alive=app.OLLAMA_KEEP_ALIVE,
+            options={'temperature': app.TEMPERATURE, 'num_ctx': app.MAX_TOKENS}
+        )
+        rows.append({
+            'message': message,
+            'prompt_eval_count': response.get('prompt_eval_count') or 0,
+            'prompt_eval_ms': (response.get('prompt_eval_duration') or 0) / 1e6,
+        })
+        bot.add_to_history('user', message)
+        bot.add_to_history('assistant', response['message']['content'])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare prompt evaluation cost per prompt layout')
+    parser.add_argument('--layouts', nargs='+', default=['legacy', 'stable'], choices=['legacy', 'stable'])
+    parser.add_argument('--repeat', type=int, default=2, help='times to replay the conversation')
+    parser.add_argument('--fake', action='store_true', help='run against an in-process fake Ollama')
+    parser.add_argument('--prompt-rate', type=float, default=400.0, help='fake Ollama prompt tokens/sec')
+    args = parser.parse_args()
+
+    if args.fake:
+        from benchmarks.fake_ollama import FakeOllamaConfig, make_server
+
+        server = make_server(port=0, config=FakeOllamaConfig(latency=0.0, token_rate=0, tokens=40,
+                                                             prompt_rate=args.prompt_rate))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ['OLLAMA_HOST'] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    logging.disable(logging.WARNING)
+    import app
+
+    turns = CONVERSATION * args.repeat
+    print(f"📚 Knowledge base: {'synthetic (--fake)' if args.fake else app.SREC_DATA_FILE}")
+    for layout in args.layouts:
+        rows = run_layout(app, layout, turns, args.fake)
+        total_tokens = sum(r['prompt_eval_count'] for r in rows)
+        total_ms = sum(r['prompt_eval_ms'] for r in rows)
+        print(f"\n🧱 Layout: {layout}")
+        print(f"{'turn':>4}  {'prompt tokens':>13}  {'prompt ms':>10}  message")
+        for i, r in enumerate(rows, 1):
+            print(f"{i:>4}  {r['prompt_eval_count']:>13}  {r['prompt_eval_ms']:>10.1f}  {r['message'][:40]}")
+        print(f"{'sum':>4}  {total_tokens:>13}  {total_ms:>10.1f}  "
+              f"(mean {total_ms / len(rows):.1f} ms/turn)")
+
+
+if __name__ == '__main__':
+    main()
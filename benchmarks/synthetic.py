@@ -0,0 +1,68 @@
+"""Synthetic data helpers shared by the benchmarks and the fake Ollama server"""
+import hashlib
+import math
+import random
+import re
+
+EMBED_DIM = 256
+
+TOPICS = [
+    'admission', 'fees', 'hostel', 'library', 'placement', 'sports', 'transport',
+    'canteen', 'scholarship', 'laboratory', 'faculty', 'principal', 'exam', 'syllabus',
+    'internship', 'workshop', 'alumni', 'campus', 'department', 'timings'
+]
+BRANCHES = ['CSE', 'ECE', 'EEE', 'Civil', 'Mechanical', 'AI&DS', 'MBA', 'MCA']
+TEMPLATES = [
+    "What is the {topic} policy for {branch} students at SREC?",
+    "Who handles {topic} queries in the {branch} department?",
+    "When does {topic} registration open for {branch} at SREC?",
+    "How do I apply for {topic} in {branch}?",
+    "Where is the {topic} office for {branch} located?",
+]
+
+
+def hash_embed(texts, dim=EMBED_DIM):
+    """Deterministic bag-of-words embedding: similar wording gives similar vectors"""
+    vectors = []
+    for text in texts:
+        vec = [0.0] * dim
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(token.encode('utf-8')).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % dim
+            vec[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        vectors.append([v / norm for v in vec])
+    return vectors
+
+
+def make_qa(n, seed=0):
+    """Build `n` synthetic SREC-style QA entries"""
+    rng = random.Random(seed)
+    qa = []
+    for i in range(n):
+        topic = rng.choice(TOPICS)
+        branch = rng.choice(BRANCHES)
+        question = rng.choice(TEMPLATES).format(topic=topic, branch=branch)
+        qa.append({
+            'question': f"{question} (ref {i})",
+            'answer': f"The {topic} desk for {branch} (ref {i}) is open 9 AM to 4 PM on working days."
+        })
+    return qa
+
+
+def make_queries(n, seed=1):
+    """Build `n` user-style queries over the same vocabulary as make_qa"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(topic=rng.choice(TOPICS), branch=rng.choice(BRANCHES))
+        for _ in range(n)
+    ]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; returns None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Build the frontend for production into frontend/dist/.
+
+Each asset referenced from index.html is minified (CSS always; JS when the
+optional rjsmin package is installed), written under a content-hashed name
+such as app.3f9c2a1b7d.js, and precompressed to .gz (and .br when the
+optional brotli package is installed). index.html is rewritten to point at
+the hashed names and a manifest.json is written for the server.
+
+    python build_frontend.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(ROOT, 'frontend')
+DIST_DIR = os.path.join(SRC_DIR, 'dist')
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon',
+    '.json': 'application/json',
+}
+COMPRESSIBLE = {'.html', '.js', '.css', '.svg', '.json'}
+ASSET_REF = re.compile(r'''(?P<attr>\b(?:src|href)=["'])(?P<path>[^"':?#]+\.(?:js|css|png|svg|ico))(?P<end>["'])''')
+
+
+def minify_css(text):
+    """Conservative CSS minifier: comments, indentation and spaces around punctuation"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    text = text.replace(';}', '}')
+    return text.strip()
+
+
+def minify_js(text):
+    # A regex minifier is not safe for JS (template literals, regex literals), so
+    # only minify when rjsmin is available; gzip/brotli still apply either way.
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    return text
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def write_variants(name, data, ext):
+    """Write the file plus .gz/.br variants that are actually smaller"""
+    path = os.path.join(DIST_DIR, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    encodings = []
+    if ext in COMPRESSIBLE:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            with open(path + '.gz', 'wb') as f:
+                f.write(gz)
+            encodings.append('gzip')
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                with open(path + '.br', 'wb') as f:
+                    f.write(br)
+                encodings.append('br')
+    return encodings
+
+
+def build_asset(rel_path):
+    src = os.path.join(SRC_DIR, rel_path)
+    stem, ext = os.path.splitext(rel_path)
+    with open(src, 'rb') as f:
+        data = f.read()
+
+    if ext == '.css':
+        data = minify_css(data.decode('utf-8')).encode('utf-8')
+    elif ext == '.js':
+        data = minify_js(data.decode('utf-8')).encode('utf-8')
+
+    digest = content_hash(data)
+    hashed = f"{stem}.{digest}{ext}"
+    os.makedirs(os.path.dirname(os.path.join(DIST_DIR, hashed)), exist_ok=True)
+    encodings = write_variants(hashed, data, ext)
+    return hashed, {
+        'etag': digest,
+        'content_type': CONTENT_TYPES.get(ext, 'application/octet-stream'),
+        'encodings': encodings,
+        'immutable': True,
+        'size': len(data),
+    }
+
+
+def main():
+    index_path = os.path.join(SRC_DIR, 'index.html')
+    if not os.path.exists(index_path):
+        print(f"❌ {index_path} not found")
+        sys.exit(1)
+
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    os.makedirs(DIST_DIR)
+
+    with open(index_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    assets = {}
+    files = {}
+    for match in ASSET_REF.finditer(html):
+        rel_path = match.group('path').lstrip('./')
+        if rel_path in assets or not os.path.exists(os.path.join(SRC_DIR, rel_path)):
+            continue
+        hashed, info = build_asset(rel_path)
+        assets[rel_path] = hashed
+        files[hashed] = info
+        print(f"   {rel_path:<24} -> {hashed} ({info['size']} bytes, {', '.join(info['encodings']) or 'uncompressed'})")
+
+    def rewrite(match):
+        rel_path = match.group('path').lstrip('./')
+        if rel_path not in assets:
+            return match.group(0)
+        return f"{match.group('attr')}{assets[rel_path]}{match.group('end')}"
+
+    html_data = ASSET_REF.sub(rewrite, html).encode('utf-8')
+    files['index.html'] = {
+        'etag': content_hash(html_data),
+        'content_type': CONTENT_TYPES['.html'],
+        'encodings': write_variants('index.html', html_data, '.html'),
+        'immutable': False,  # entry point: revalidated on every load
+        'size': len(html_data),
+    }
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets, 'files': files}, f, indent=2)
+
+    missing = [name for name, mod in (('brotli', brotli), ('rjsmin', rjsmin)) if mod is None]
+    print(f"✅ Frontend built into {os.path.relpath(DIST_DIR, ROOT)}")
+    if missing:
+        print(f"   Optional: pip install {' '.join(missing)} for smaller output")
+
+
+if __name__ == '__main__':
+    main()
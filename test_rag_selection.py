@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline tests for RAG context selection and batch retrieval (no Ollama needed).
+
+Uses the deterministic hash embedder from benchmarks/synthetic.py.
+
+    python -m pytest test_rag_selection.py
+"""
+
+import numpy as np
+import pytest
+
+from app import RAG_DUPLICATE_THRESHOLD, RAGSystem
+from benchmarks.synthetic import hash_embed
+
+QA = [
+    {'question': 'Where is the SREC library located?', 'answer': 'Ground floor of the main block.'},
+    {'question': 'Where is the SREC library located?', 'answer': 'Ground floor of the main block.'},
+    {'question': 'What are the SREC library timings?', 'answer': 'The library is open 9 AM to 6 PM.'},
+    {'question': 'Who is the principal of SREC?', 'answer': 'Dr. K. Jaya Chandra.'},
+]
+
+
+def make_rag(qa=QA):
+    rag = RAGSystem(data_path=None, embedder=hash_embed)
+    rag.qa_data = qa
+    rag.store = rag.ingest_and_index(qa)
+    return rag
+
+
+def cosine(rag, query, idx):
+    q = np.array(hash_embed([query])[0], dtype='float32')
+    q /= np.linalg.norm(q)
+    return float(q @ rag.store['emb_array'][idx])
+
+
+def test_scores_stay_aligned_with_skipped_ids():
+    rag = make_rag()
+    # FAISS pads missing results with id -1; those must not shift the remaining scores
+    selected = rag.select_context([0.9, -3.4e38, 0.8], [3, -1, 2], top_k=3, min_score=0.0, max_gap=1.0)
+    assert [(r['meta']['id'], r['score']) for r in selected] == [(3, 0.9), (2, pytest.approx(0.8))]
+
+
+def test_query_rag_scores_match_documents():
+    rag = make_rag()
+    query = 'SREC library timings'
+    # 4 documents but top_k * RAG_CANDIDATE_MULTIPLIER slots requested, so FAISS returns -1 ids
+    result = rag.query_rag(query, top_k=3, min_score=0.0, max_gap=1.0)
+    assert result is not None
+    for r in result['retrieved']:
+        assert abs(r['score'] - cosine(rag, query, r['meta']['id'])) < 1e-5
+
+
+def test_near_duplicates_are_dropped():
+    rag = make_rag()
+    emb = rag.store['emb_array']
+    assert float(emb[0] @ emb[1]) >= RAG_DUPLICATE_THRESHOLD
+
+    result = rag.query_rag('Where is the SREC library located?', top_k=3, min_score=0.0, max_gap=1.0)
+    ids = [r['meta']['id'] for r in result['retrieved']]
+    assert len({0, 1} & set(ids)) == 1
+
+
+def test_nothing_relevant_returns_none():
+    rag = make_rag()
+    assert rag.query_rag('zebra swimming pool', min_score=0.5) is None
+    assert rag.select_context([0.2, 0.1], [0, 2], min_score=0.5) == []
+
+
+# Batch retrieval (query_rag_batch)
+
+def test_batch_falls_back_to_single_queries():
+    rag = make_rag()
+
+    def single_only(texts):
+        if len(texts) > 1:
+            raise RuntimeError('batch embedding timed out')
+        return hash_embed(texts)
+
+    rag.embedder = single_only
+    queries = ['SREC library timings', 'Who is the principal of SREC?']
+    results = rag.query_rag_batch(queries)
+    assert [r['retrieved'][0]['meta']['id'] for r in results] == [2, 3]
+
+
+def test_batch_matches_single_queries():
+    rag = make_rag()
+    queries = ['SREC library timings', 'Who is the principal of SREC?', 'zebra swimming pool']
+
+    def ids(result):
+        return [r['meta']['id'] for r in result['retrieved']] if result else None
+
+    batch = rag.query_rag_batch(queries)
+    assert [ids(r) for r in batch] == [ids(rag.query_rag(q)) for q in queries]
+    assert batch[2] is None
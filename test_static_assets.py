@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Offline tests for serving the prebuilt frontend (utils/static_assets.py).
+
+    python -m pytest test_static_assets.py
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+from flask import Flask, request
+
+from utils.static_assets import StaticAssets
+
+APP_JS = b'console.log("hello");\n' * 50
+
+
+@pytest.fixture
+def assets(tmp_path):
+    files = {
+        'app.0123456789.js': {'etag': '0123456789', 'content_type': 'application/javascript; charset=utf-8',
+                              'encodings': ['gzip', 'br'], 'immutable': True},
+        'index.html': {'etag': 'abcdef0123', 'content_type': 'text/html; charset=utf-8',
+                       'encodings': [], 'immutable': False},
+    }
+    (tmp_path / 'app.0123456789.js').write_bytes(APP_JS)
+    (tmp_path / 'app.0123456789.js.gz').write_bytes(gzip.compress(APP_JS))
+    (tmp_path / 'app.0123456789.js.br').write_bytes(b'brotli-bytes')
+    (tmp_path / 'index.html').write_bytes(b'<html></html>')
+    (tmp_path / 'manifest.json').write_text(json.dumps({'files': files}))
+    return StaticAssets(str(tmp_path))
+
+
+def respond(assets, name, headers=None):
+    app = Flask(__name__)
+    with app.test_request_context('/' + name, headers=headers or {}):
+        return assets.response(name, request)
+
+
+def test_missing_manifest_disables_serving(tmp_path):
+    assert not StaticAssets(os.path.join(str(tmp_path), 'dist')).enabled
+
+
+def test_prefers_brotli_then_gzip_then_identity(assets):
+    response, _ = respond(assets, 'app.0123456789.js', {'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.get_data() == b'brotli-bytes'
+
+    response, _ = respond(assets, 'app.0123456789.js', {'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == APP_JS
+
+    response, _ = respond(assets, 'app.0123456789.js')
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == APP_JS
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_cache_control(assets):
+    response, _ = respond(assets, 'app.0123456789.js')
+    assert 'immutable' in response.headers['Cache-Control']
+    response, _ = respond(assets, 'index.html')
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+
+def test_etag_is_per_encoding(assets):
+    gz, _ = respond(assets, 'app.0123456789.js', {'Accept-Encoding': 'gzip'})
+    plain, _ = respond(assets, 'app.0123456789.js')
+    assert gz.headers['ETag'] != plain.headers['ETag']
+
+    # A gzip ETag must not validate the identity variant
+    response, not_modified = respond(assets, 'app.0123456789.js', {'If-None-Match': gz.headers['ETag']})
+    assert not not_modified and response.status_code == 200
+
+
+@pytest.mark.parametrize('weak', [False, True])
+def test_conditional_request_returns_304(assets, weak):
+    first, _ = respond(assets, 'index.html')
+    etag = ('W/' if weak else '') + first.headers['ETag']
+
+    response, not_modified = respond(assets, 'index.html', {'If-None-Match': etag})
+    assert not_modified
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == first.headers['ETag']
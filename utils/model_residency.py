@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResidency:
+    """Warm up models and keep them resident, re-warming any that get evicted.
+
+    `warmers` maps a model name to a callable that loads it (a tiny request
+    with a long keep_alive); `list_loaded` returns the names of the models the
+    server currently has in memory.
+    """
+
+    def __init__(self, warmers, list_loaded, interval=60):
+        self.warmers = dict(warmers)
+        self.list_loaded = list_loaded
+        self.interval = interval
+        self.models = {
+            name: {'state': 'unknown', 'load_seconds': None, 'last_warmed': None,
+                   'warm_count': 0, 'error': None}
+            for name in self.warmers
+        }
+        self._lock = threading.Lock()
+        self._keeper = None
+        self._stop = threading.Event()
+
+    def warm(self, name):
+        """Load one model and record how long it took; returns True on success"""
+        with self._lock:
+            self.models[name]['state'] = 'loading'
+        started = time.perf_counter()
+        try:
+            self.warmers[name]()
+        except Exception as e:
+            logger.error(f"Warm-up failed for {name}: {e}")
+            with self._lock:
+                self.models[name].update(state='error', error=str(e))
+            return False
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.models[name].update(state='warm', load_seconds=round(elapsed, 3), last_warmed=time.time(),
+                                     warm_count=self.models[name]['warm_count'] + 1, error=None)
+        logger.info(f"Model {name} warm in {elapsed:.2f}s")
+        return True
+
+    def warm_all(self):
+        return all([self.warm(name) for name in self.warmers])
+
+    def is_warm(self, name):
+        return self.models[name]['state'] == 'warm'
+
+    def check(self):
+        """Mark models the server has evicted as cold and warm them again"""
+        try:
+            loaded = self.list_loaded()
+        except Exception as e:
+            logger.warning(f"Could not list loaded models: {e}")
+            return
+
+        for name in self.warmers:
+            if any(name in loaded_name for loaded_name in loaded):
+                with self._lock:
+                    # Also recovers models whose warm-up failed but that were loaded later
+                    if self.models[name]['state'] in ('unknown', 'cold', 'error'):
+                        self.models[name].update(state='warm', error=None)
+                continue
+
+            if self.models[name]['state'] != 'loading':
+                logger.info(f"Model {name} is not loaded, re-warming")
+                with self._lock:
+                    self.models[name]['state'] = 'cold'
+                self.warm(name)
+
+    def _run(self, warm_first):
+        if warm_first:
+            self.warm_all()
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self, warm_first=True):
+        """Warm all models and start the keeper in a daemon thread (idempotent)"""
+        if self._keeper is None:
+            self._keeper = threading.Thread(target=self._run, args=(warm_first,),
+                                            name='model-keeper', daemon=True)
+            self._keeper.start()
+        return self._keeper
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        with self._lock:
+            return {
+                'keeper_running': self._keeper is not None and self._keeper.is_alive(),
+                'check_interval_seconds': self.interval,
+                'models': {name: dict(info) for name, info in self.models.items()}
+            }
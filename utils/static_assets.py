@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+# Encodings we serve precompressed, in order of preference
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticAssets:
+    """Serves the output of build_frontend.py from memory.
+
+    Hashed assets get a one-year immutable Cache-Control; index.html is
+    revalidated each load. Every response carries an ETag and conditional
+    requests are answered with 304 without touching the body.
+    """
+
+    def __init__(self, dist_dir):
+        self.dist_dir = dist_dir
+        self.files = {}
+        self.load()
+
+    @property
+    def enabled(self):
+        return bool(self.files)
+
+    def load(self):
+        manifest_path = os.path.join(self.dist_dir, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            files = {}
+            for name, info in manifest.get('files', {}).items():
+                variants = {}
+                for encoding, suffix in (('identity', ''),) + ENCODING_SUFFIXES:
+                    if encoding != 'identity' and encoding not in info.get('encodings', []):
+                        continue
+                    with open(os.path.join(self.dist_dir, name + suffix), 'rb') as f:
+                        variants[encoding] = f.read()
+                files[name] = dict(info, variants=variants)
+            self.files = files
+            logger.info(f"Serving {len(files)} prebuilt frontend files from {self.dist_dir}")
+        except Exception as e:
+            logger.error(f"Failed to load prebuilt frontend, serving sources instead: {e}")
+            self.files = {}
+
+    def has(self, name):
+        return name in self.files
+
+    def response(self, name, request):
+        """Build the response for `name`, honouring Accept-Encoding and If-None-Match"""
+        info = self.files[name]
+        encoding = 'identity'
+        for candidate, _ in ENCODING_SUFFIXES:
+            if candidate in info['variants'] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        etag = f"{info['etag']}-{encoding}"
+        headers = {
+            'ETag': f'"{etag}"',
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'public, max-age=31536000, immutable' if info['immutable'] else 'no-cache',
+        }
+        # Weak comparison: proxies that re-encode responses turn our ETag into W/"..."
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers), True
+
+        body = info['variants'][encoding]
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(body, content_type=info['content_type'], headers=headers), False
@@ -0,0 +1,181 @@
+"""Sampled request tracing with optional cProfile captures.
+
+Only 1-in-N requests are traced. For the others `span()` costs one
+thread-local lookup, so instrumentation can stay in the hot path.
+"""
+import cProfile
+import io
+import itertools
+import json
+import logging
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+
+class Trace:
+    def __init__(self, trace_id, name, attrs=None, profile=False):
+        self.trace_id = trace_id
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.started_at = time.time()
+        self.thread = threading.get_ident()
+        self._t0 = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []
+        self._stack = []
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile = None
+
+    def _now_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'attrs': self.attrs,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'spans': self.spans,
+            'profile': self.profile,
+        }
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates sampled traces and keeps the slowest recent ones in memory"""
+
+    def __init__(self, sample_rate=0, profile_rate=0, slow_ms=0.0, buffer_size=100, sink_path=None):
+        self.sample_rate = sample_rate  # trace 1 in N requests; 0 disables tracing
+        self.profile_rate = profile_rate  # cProfile 1 in N traced requests; 0 disables profiling
+        self.slow_ms = slow_ms  # only keep traces at least this slow
+        self.sink_path = sink_path  # optional JSON-lines file receiving kept traces
+        self.traces = deque(maxlen=buffer_size)
+        self._counter = itertools.count()
+        self._profile_counter = itertools.count()
+        self._local = threading.local()
+        self._sink_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def start_trace(self, name, trace_id=None, **attrs):
+        """Return a Trace if this request is sampled, else None"""
+        if not self.sample_rate or next(self._counter) % self.sample_rate:
+            return None
+        profile = bool(self.profile_rate) and next(self._profile_counter) % self.profile_rate == 0
+        return Trace(trace_id or new_trace_id(), name, attrs, profile=profile)
+
+    @contextmanager
+    def activate(self, trace):
+        """Make `trace` current for this thread (no-op for None)"""
+        if trace is None:
+            yield None
+            return
+        previous = getattr(self._local, 'trace', None)
+        self._local.trace = trace
+        if trace.profiler is not None:
+            try:
+                trace.profiler.enable()
+            except ValueError:
+                # Another profiler is already active on this thread
+                trace.profiler = None
+        try:
+            yield trace
+        finally:
+            if trace.profiler is not None:
+                trace.profiler.disable()
+            self._local.trace = previous
+
+    def span(self, name, **attrs):
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return _NOOP_SPAN
+        return self._span(trace, name, attrs)
+
+    @contextmanager
+    def _span(self, trace, name, attrs):
+        start = trace._now_ms()
+        trace._stack.append(name)
+        try:
+            yield
+        finally:
+            trace._stack.pop()
+            trace.spans.append({
+                'name': name,
+                'start_ms': round(start, 3),
+                'duration_ms': round(trace._now_ms() - start, 3),
+                'depth': len(trace._stack),
+                'thread': threading.get_ident(),
+                **attrs,
+            })
+
+    def finish(self, trace, **attrs):
+        """Close a trace and keep it if it is slow enough"""
+        if trace is None:
+            return
+        trace.duration_ms = round(trace._now_ms(), 3)
+        trace.attrs.update(attrs)
+        if trace.profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(trace.profiler, stream=out).sort_stats('cumulative').print_stats(30)
+            trace.profile = out.getvalue()
+            trace.profiler = None
+        if trace.duration_ms < self.slow_ms:
+            return
+
+        self.traces.append(trace)
+        if self.sink_path:
+            try:
+                with self._sink_lock, open(self.sink_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(trace.to_dict()) + '\n')
+            except OSError as e:
+                logger.error(f"Failed to write trace to {self.sink_path}: {e}")
+
+    def recent(self, limit=20, min_ms=0.0):
+        """Most recent kept traces, slowest first"""
+        traces = [t for t in list(self.traces) if t.duration_ms >= min_ms]
+        traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        return traces[:limit]
+
+    def get(self, trace_id):
+        return next((t for t in list(self.traces) if t.trace_id == trace_id), None)
+
+    @staticmethod
+    def chrome_trace(traces):
+        """Traces in Chrome trace-event format (load in chrome://tracing or Perfetto)"""
+        events = []
+        for pid, trace in enumerate(traces, 1):
+            base_us = trace.started_at * 1e6
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid,
+                           'args': {'name': f"{trace.name} {trace.trace_id}"}})
+            events.append({'name': trace.name, 'cat': 'request', 'ph': 'X', 'pid': pid, 'tid': trace.thread,
+                           'ts': base_us, 'dur': trace.duration_ms * 1000, 'args': trace.attrs})
+            for span in trace.spans:
+                args = {k: v for k, v in span.items()
+                        if k not in ('name', 'start_ms', 'duration_ms', 'depth', 'thread')}
+                events.append({'name': span['name'], 'cat': 'stage', 'ph': 'X', 'pid': pid,
+                               'tid': span['thread'], 'ts': base_us + span['start_ms'] * 1000,
+                               'dur': span['duration_ms'] * 1000, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}